@@ -143,14 +143,17 @@ def create_app(config_name):
         return response
     
     # Load configuration
-    if config_name == 'production':
-        app.config.from_object('config.ProductionConfig')
-    else:
-        app.config.from_object('config.DevelopmentConfig')
+    profile = 'production' if config_name == 'production' else 'development'
+    config_class = config[profile]()
+    app.config.from_object(config_class)
     
     # Override config with environment variables
     app.config.from_envvar('FLASK_CONFIG_FILE', silent=True)
     
+    # Resolve the database URI only if the config file did not set one
+    if not app.config.get('SQLALCHEMY_DATABASE_URI'):
+        app.config['SQLALCHEMY_DATABASE_URI'] = config_class.resolve_db_uri(profile)
+    
     # Load webhook secret from environment
     app.config['FORMS_WEBHOOK_SECRET'] = os.environ.get('FORMS_WEBHOOK_SECRET')
     if not app.config['FORMS_WEBHOOK_SECRET']:
@@ -5,6 +5,7 @@ from models import (AcademicYear, Student, TuitionRecord, Shiur, AttendancePerio
                    StudentMatriculationAssignment, db)
 from extensions import db
 from utils.decorators import permission_required
+from utils.helpers import invalidate_active_academic_year
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 import json
@@ -139,6 +140,7 @@ def set_active_academic_year(year_id):
         
         year.is_active = True
         db.session.commit()
+        invalidate_active_academic_year()
         
         return jsonify({'success': True, 'message': f'{year.year_label} is now the active academic year'})
     except Exception as e:
@@ -3,7 +3,7 @@ from flask_login import login_required
 from models import DivisionConfig, db
 from extensions import mail
 from utils.decorators import permission_required
-from email_service import EmailService
+from email_service import EmailService, invalidate_email_config
 from pdf_service import PDFService
 from storage_service import StorageService
 import subprocess
@@ -61,6 +61,7 @@ def settings_page():
         division_configs[division] = config
     
     db.session.commit()
+    invalidate_email_config()
     
     # Get storage configuration
     storage_service = StorageService()
@@ -452,6 +453,7 @@ def update_division_email(division):
         config.email_reply_to = request.form.get('email_reply_to', '')
         
         db.session.commit()
+        invalidate_email_config()
         flash(f'{division} email settings updated successfully!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -541,6 +543,7 @@ def manage_email_config(division):
                 config.acceptance_email_body = data['acceptance_email_template']
             
             db.session.commit()
+            invalidate_email_config()
             
             return jsonify({'success': True, 'message': 'Configuration updated'})
     
@@ -1,48 +1,266 @@
 from flask import Blueprint, request, jsonify, render_template, current_app
 from flask_login import login_required
+from sqlalchemy.orm import joinedload
 from models import Application, Student, FileAttachment
 from extensions import db
 from utils.decorators import permission_required
-from utils.helpers import verify_webhook_signature
+from utils.helpers import verify_webhook_signature, get_active_academic_year_id
 import phpserialize
+import collections
+import hashlib
 import json
+import re
+import secrets
+import tempfile
+import threading
 import uuid
-from datetime import datetime
+from datetime import datetime, date
 import os
 import requests
-from urllib.parse import urlparse, unquote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse, unquote, unquote_to_bytes
 import mimetypes
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 webhooks = Blueprint('webhooks', __name__)
 
-# Store last received webhook data (for debugging)
-last_webhook_data = None
-last_webhook_error = None
+# Shared HTTP session for attachment downloads so that files coming from the
+# same host reuse pooled keep-alive connections instead of a new TLS handshake
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+)
+_SESSION.mount('http://', _adapter)
+_SESSION.mount('https://', _adapter)
+
+# Process umask, read once at import (os.umask can only be read by setting it,
+# which is not thread-safe) so saved attachments get the usual file mode rather
+# than the owner-only mode of their temporary file
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Most recent webhook submissions (for debugging), newest first. Bounded so
+# large payloads are not retained indefinitely, and locked for threaded workers
+_DEBUG_LOCK = threading.Lock()
+_RECENT_WEBHOOKS = collections.deque(maxlen=16)
+
+def json_loads(data):
+    """Parse JSON text or bytes, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj):
+    """Serialize to a compact JSON string, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+class LazyJSON:
+    """Defer JSON serialization of a log argument until a handler emits it."""
+    
+    def __init__(self, obj):
+        self.obj = obj
+    
+    def __str__(self):
+        return json_dumps(self.obj)
+
+def json_response(payload, status=200):
+    """Build a JSON response, serializing with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return current_app.response_class(orjson.dumps(payload), status=status, mimetype='application/json')
+    return jsonify(payload), status
+
+def get_request_json():
+    """Parse the JSON body of the current request."""
+    if ORJSON_AVAILABLE and request.is_json:
+        return orjson.loads(request.get_data())
+    return request.get_json()
+
+# Known divisions, and the form-title keywords that identify them (checked in order)
+_DIVISIONS = frozenset(('YZA', 'YOH', 'KOLLEL'))
+_DIVISION_KEYWORDS = {'yza': 'YZA', 'yoh': 'YOH', 'kollel': 'KOLLEL'}
+
+# Fields a submission must include (the name parts are optional when a
+# combined student_name is sent)
+_REQUIRED_FIELDS = ('student_first_name', 'student_last_name', 'email')
+
+# Field IDs that may carry the tuition payment status, in priority order
+_TUITION_KEYS = ('tuition_payment_status', '47', 'payment_status', 'financial_status')
+
+# Classifies a payment status in one pass; the lookahead alternation keeps
+# "full" ahead of the financial aid keywords wherever they occur in the text
+_PAYMENT_STATUS_RE = re.compile(
+    r'(?=.*(full))|(?=.*(financial.*aid|aid.*financial|scholarship))',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Date formats accepted for single-field dates, tried in order
+_DATE_FORMATS = (
+    '%Y-%m-%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%Y/%m/%d',
+    '%m-%d-%Y',
+    '%d-%m-%Y'
+)
+
+# Delimiters separating schools in free-text school fields
+_SCHOOL_DELIM_RE = re.compile(r'[;,\n]+')
+
+def normalize_form_data(data):
+    """Map every submitted field to a stripped string keyed by its string ID."""
+    normalized = {}
+    for key, value in data.items():
+        if isinstance(value, str):
+            normalized[str(key)] = value.strip()
+        elif value:
+            normalized[str(key)] = str(value).strip()
+    return normalized
+
+# Application attributes copied from form fields, with the field IDs tried in order
+_APPLICATION_FIELDS = (
+    ('student_first_name', ('student_first_name',)),
+    ('student_middle_name', ('student_middle_name',)),
+    ('student_last_name', ('student_last_name',)),
+    ('phone_number', ('phone_number', 'phone')),
+    ('email', ('email',)),
+    ('hebrew_name', ('hebrew_name',)),
+    ('informal_name', ('informal_name', 'nickname')),
+    ('social_security_number', ('social_security_number', 'ssn')),
+    ('citizenship', ('citizenship',)),
+    ('high_school_graduate', ('high_school_graduate', 'graduated_high_school')),
+    ('marital_status', ('marital_status',)),
+    ('spouse_name', ('spouse_name',)),
+    # Address fields
+    ('address_line1', ('address_line1', 'address')),
+    ('address_line2', ('address_line2',)),
+    ('address_city', ('address_city', 'city')),
+    ('address_state', ('address_state', 'state')),
+    ('address_zip', ('address_zip', 'zip')),
+    ('address_country', ('address_country', 'country')),
+    # Alternate address
+    ('alt_address_line1', ('alt_address_line1', 'alternate_address')),
+    ('alt_address_line2', ('alt_address_line2',)),
+    ('alt_address_city', ('alt_address_city',)),
+    ('alt_address_state', ('alt_address_state',)),
+    ('alt_address_zip', ('alt_address_zip',)),
+    ('alt_address_country', ('alt_address_country',)),
+    # Parent information
+    ('father_title', ('father_title',)),
+    ('father_first_name', ('father_first_name',)),
+    ('father_last_name', ('father_last_name',)),
+    ('father_phone', ('father_phone',)),
+    ('father_email', ('father_email',)),
+    ('father_occupation', ('father_occupation',)),
+    ('mother_title', ('mother_title',)),
+    ('mother_first_name', ('mother_first_name',)),
+    ('mother_last_name', ('mother_last_name',)),
+    ('mother_phone', ('mother_phone',)),
+    ('mother_email', ('mother_email',)),
+    ('mother_occupation', ('mother_occupation',)),
+    # Grandparents
+    ('paternal_grandfather_first_name', ('paternal_grandfather_first_name',)),
+    ('paternal_grandfather_last_name', ('paternal_grandfather_last_name',)),
+    ('paternal_grandfather_phone', ('paternal_grandfather_phone',)),
+    ('paternal_grandfather_email', ('paternal_grandfather_email',)),
+    ('paternal_grandfather_address_line1', ('paternal_grandfather_address_line1',)),
+    ('paternal_grandfather_address_city', ('paternal_grandfather_address_city',)),
+    ('paternal_grandfather_address_state', ('paternal_grandfather_address_state',)),
+    ('paternal_grandfather_address_zip', ('paternal_grandfather_address_zip',)),
+    ('maternal_grandfather_first_name', ('maternal_grandfather_first_name',)),
+    ('maternal_grandfather_last_name', ('maternal_grandfather_last_name',)),
+    ('maternal_grandfather_phone', ('maternal_grandfather_phone',)),
+    ('maternal_grandfather_email', ('maternal_grandfather_email',)),
+    ('maternal_grandfather_address_line1', ('maternal_grandfather_address_line1',)),
+    ('maternal_grandfather_address_city', ('maternal_grandfather_address_city',)),
+    ('maternal_grandfather_address_state', ('maternal_grandfather_address_state',)),
+    ('maternal_grandfather_address_zip', ('maternal_grandfather_address_zip',)),
+    # In-laws (if married)
+    ('inlaws_first_name', ('inlaws_first_name',)),
+    ('inlaws_last_name', ('inlaws_last_name',)),
+    ('inlaws_phone', ('inlaws_phone',)),
+    ('inlaws_email', ('inlaws_email',)),
+    ('inlaws_address_line1', ('inlaws_address_line1',)),
+    ('inlaws_address_city', ('inlaws_address_city',)),
+    ('inlaws_address_state', ('inlaws_address_state',)),
+    ('inlaws_address_zip', ('inlaws_address_zip',)),
+    # Educational information
+    ('college_attending', ('college_attending', 'attending_college')),
+    ('college_name', ('college_name',)),
+    ('college_major', ('college_major',)),
+    ('college_expected_graduation', ('college_expected_graduation',)),
+    # Learning information
+    ('last_rebbe_name', ('last_rebbe_name', 'rebbe_name')),
+    ('last_rebbe_phone', ('last_rebbe_phone', 'rebbe_phone')),
+    ('gemora_sedorim_daily_count', ('gemora_sedorim_daily_count',)),
+    ('gemora_sedorim_length', ('gemora_sedorim_length',)),
+    ('learning_evaluation', ('learning_evaluation',)),
+    # Medical information
+    ('medical_conditions', ('medical_conditions', 'medical_history')),
+    ('insurance_company', ('insurance_company',)),
+    ('blood_type', ('blood_type',)),
+    # Activities/work
+    ('past_jobs', ('past_jobs', 'work_history')),
+    ('summer_activities', ('summer_activities',)),
+    # Other
+    ('dormitory_meals_option', ('dormitory_meals_option', 'housing_preference')),
+    ('additional_info', ('additional_info', 'comments', 'notes')),
+)
+
+def record_webhook_event(data, error=None):
+    """Add a webhook submission to the debug ring buffer and return its entry."""
+    entry = {'received_at': datetime.utcnow(), 'data': data, 'error': error}
+    with _DEBUG_LOCK:
+        _RECENT_WEBHOOKS.appendleft(entry)
+    return entry
+
+def record_webhook_error(entry, error):
+    """Attach an error to a buffered webhook entry, or buffer it on its own."""
+    if entry is None:
+        record_webhook_event(None, error)
+        return
+    with _DEBUG_LOCK:
+        entry['error'] = error
 
 def detect_division_from_data(data):
     """Detect division based on form data."""
     # Check division field directly
-    if 'division' in data:
-        division_value = data['division'].upper()
-        if division_value in ['YZA', 'YOH', 'KOLLEL']:
+    division_value = data.get('division')
+    if division_value:
+        division_value = division_value.upper()
+        if division_value in _DIVISIONS:
             return division_value
     
     # Check form title/ID patterns
-    if 'form_title' in data:
-        form_title = data['form_title'].lower()
-        if 'yza' in form_title:
-            return 'YZA'
-        elif 'yoh' in form_title:
-            return 'YOH'
-        elif 'kollel' in form_title:
-            return 'KOLLEL'
+    form_title = data.get('form_title')
+    if form_title:
+        form_title = form_title.casefold()
+        for keyword, label in _DIVISION_KEYWORDS.items():
+            if keyword in form_title:
+                return label
     
     # Default to YZA if cannot detect
     return 'YZA'
 
 def process_form_submission(data, division=None):
     """Process the form submission data and create an application."""
-    global last_webhook_data, last_webhook_error
+    # Normalize the submission once so field lookups are plain dict hits
+    nd = normalize_form_data(data)
+    
+    # Reject incomplete submissions before building any ORM state
+    required_fields = _REQUIRED_FIELDS[2:] if nd.get('student_name') else _REQUIRED_FIELDS
+    missing = [field for field in required_fields if not nd.get(field)]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
     
     try:
         # Detect division if not provided
@@ -51,22 +269,8 @@ def process_form_submission(data, division=None):
         
         # Helper function to safely get field values
         def get_field(field_id, default=''):
-            """Get field value from data, handling both direct access and nested structures."""
-            # Try direct access first
-            if field_id in data:
-                value = data[field_id]
-                if isinstance(value, str):
-                    return value.strip()
-                return str(value).strip() if value else default
-            
-            # Try nested field ID format (e.g., "1" for field ID 1)
-            if str(field_id) in data:
-                value = data[str(field_id)]
-                if isinstance(value, str):
-                    return value.strip()
-                return str(value).strip() if value else default
-            
-            return default
+            """Get field value from the normalized data."""
+            return nd.get(str(field_id), default)
         
         # Helper function to get numeric fields
         def get_numeric_field(field_id, default=None):
@@ -90,24 +294,15 @@ def process_form_submission(data, division=None):
         # Helper function to parse tuition payment status
         def get_tuition_payment_status():
             """Extract tuition payment status from various possible field formats."""
-            # Try different possible field IDs for tuition payment status
-            possible_fields = ['tuition_payment_status', '47', 'payment_status', 'financial_status']
-            
-            for field in possible_fields:
-                value = get_field(field, '')
-                if value:
-                    # Normalize the value
-                    value_lower = value.lower()
-                    if 'full' in value_lower:
-                        return 'Full Payment'
-                    elif 'financial' in value_lower and 'aid' in value_lower:
-                        return 'Financial Aid'
-                    elif 'scholarship' in value_lower:
-                        return 'Financial Aid'
-                    else:
-                        return value
+            value = next((nd[k] for k in _TUITION_KEYS if nd.get(k)), '')
+            if not value:
+                return 'Not Specified'
             
-            return 'Not Specified'
+            # Normalize the value
+            match = _PAYMENT_STATUS_RE.match(value)
+            if not match:
+                return value
+            return 'Full Payment' if match.group(1) else 'Financial Aid'
         
         # Helper function to parse date fields
         def parse_date(date_str):
@@ -115,19 +310,10 @@ def process_form_submission(data, division=None):
             if not date_str:
                 return None
             
-            # Try different date formats
-            date_formats = [
-                '%Y-%m-%d',
-                '%m/%d/%Y',
-                '%d/%m/%Y',
-                '%Y/%m/%d',
-                '%m-%d-%Y',
-                '%d-%m-%Y'
-            ]
-            
-            for fmt in date_formats:
+            date_str = date_str.strip()
+            for fmt in _DATE_FORMATS:
                 try:
-                    return datetime.strptime(date_str.strip(), fmt).date()
+                    return datetime.strptime(date_str, fmt).date()
                 except ValueError:
                     continue
             
@@ -136,19 +322,18 @@ def process_form_submission(data, division=None):
         # Helper function to parse date fields with specific format patterns
         def parse_date_fields(field_prefix):
             """Parse date fields that might be split into year, month, day."""
-            year = get_field(f'{field_prefix}_year', '')
-            month = get_field(f'{field_prefix}_month', '')
-            day = get_field(f'{field_prefix}_day', '')
-            
-            if year and month and day:
-                try:
-                    return datetime(int(year), int(month), int(day)).date()
-                except ValueError:
-                    pass
+            year = nd.get(f'{field_prefix}_year')
+            if year:
+                month = nd.get(f'{field_prefix}_month')
+                day = nd.get(f'{field_prefix}_day')
+                if month and day:
+                    try:
+                        return date(int(year), int(month), int(day))
+                    except ValueError:
+                        pass
             
             # Try single field
-            date_str = get_field(field_prefix, '')
-            return parse_date(date_str)
+            return parse_date(nd.get(field_prefix, ''))
         
         # Helper function to parse school info
         def parse_school_info_simple(school_text):
@@ -156,130 +341,30 @@ def process_form_submission(data, division=None):
             if not school_text:
                 return []
             
-            # Split by common delimiters
-            schools = []
-            lines = school_text.replace(';', '\n').replace(',', '\n').split('\n')
-            
-            for line in lines:
-                line = line.strip()
-                if line and len(line) > 3:  # Ignore very short entries
-                    schools.append(line)
-            
-            return schools[:3]  # Return up to 3 schools
+            # Split by common delimiters, ignoring very short entries
+            return [line for line in (part.strip() for part in _SCHOOL_DELIM_RE.split(school_text))
+                    if len(line) > 3][:3]  # Return up to 3 schools
         
         # Create application with all fields
-        application = Application(
-            id=str(uuid.uuid4()),
-            division=division,
-            student_name=get_field('student_name') or f"{get_field('student_first_name')} {get_field('student_last_name')}".strip(),
-            student_first_name=get_field('student_first_name'),
-            student_middle_name=get_field('student_middle_name'),
-            student_last_name=get_field('student_last_name'),
-            phone_number=get_field('phone_number') or get_field('phone'),
-            email=get_field('email'),
-            submitted_date=datetime.utcnow(),
-            status='Pending',
-            hebrew_name=get_field('hebrew_name'),
-            informal_name=get_field('informal_name') or get_field('nickname'),
-            social_security_number=get_field('social_security_number') or get_field('ssn'),
-            date_of_birth=parse_date_fields('date_of_birth') or parse_date(get_field('dob')),
-            citizenship=get_field('citizenship'),
-            high_school_graduate=get_field('high_school_graduate') or get_field('graduated_high_school'),
-            marital_status=get_field('marital_status'),
-            spouse_name=get_field('spouse_name'),
-            
-            # Address fields
-            address_line1=get_field('address_line1') or get_field('address'),
-            address_line2=get_field('address_line2'),
-            address_city=get_field('address_city') or get_field('city'),
-            address_state=get_field('address_state') or get_field('state'),
-            address_zip=get_field('address_zip') or get_field('zip'),
-            address_country=get_field('address_country') or get_field('country'),
-            
-            # Alternate address
-            alt_address_line1=get_field('alt_address_line1') or get_field('alternate_address'),
-            alt_address_line2=get_field('alt_address_line2'),
-            alt_address_city=get_field('alt_address_city'),
-            alt_address_state=get_field('alt_address_state'),
-            alt_address_zip=get_field('alt_address_zip'),
-            alt_address_country=get_field('alt_address_country'),
-            
-            # Parent information
-            father_title=get_field('father_title'),
-            father_first_name=get_field('father_first_name'),
-            father_last_name=get_field('father_last_name'),
-            father_phone=get_field('father_phone'),
-            father_email=get_field('father_email'),
-            father_occupation=get_field('father_occupation'),
-            mother_title=get_field('mother_title'),
-            mother_first_name=get_field('mother_first_name'),
-            mother_last_name=get_field('mother_last_name'),
-            mother_phone=get_field('mother_phone'),
-            mother_email=get_field('mother_email'),
-            mother_occupation=get_field('mother_occupation'),
-            
-            # Grandparents
-            paternal_grandfather_first_name=get_field('paternal_grandfather_first_name'),
-            paternal_grandfather_last_name=get_field('paternal_grandfather_last_name'),
-            paternal_grandfather_phone=get_field('paternal_grandfather_phone'),
-            paternal_grandfather_email=get_field('paternal_grandfather_email'),
-            paternal_grandfather_address_line1=get_field('paternal_grandfather_address_line1'),
-            paternal_grandfather_address_city=get_field('paternal_grandfather_address_city'),
-            paternal_grandfather_address_state=get_field('paternal_grandfather_address_state'),
-            paternal_grandfather_address_zip=get_field('paternal_grandfather_address_zip'),
-            
-            maternal_grandfather_first_name=get_field('maternal_grandfather_first_name'),
-            maternal_grandfather_last_name=get_field('maternal_grandfather_last_name'),
-            maternal_grandfather_phone=get_field('maternal_grandfather_phone'),
-            maternal_grandfather_email=get_field('maternal_grandfather_email'),
-            maternal_grandfather_address_line1=get_field('maternal_grandfather_address_line1'),
-            maternal_grandfather_address_city=get_field('maternal_grandfather_address_city'),
-            maternal_grandfather_address_state=get_field('maternal_grandfather_address_state'),
-            maternal_grandfather_address_zip=get_field('maternal_grandfather_address_zip'),
-            
-            # In-laws (if married)
-            inlaws_first_name=get_field('inlaws_first_name'),
-            inlaws_last_name=get_field('inlaws_last_name'),
-            inlaws_phone=get_field('inlaws_phone'),
-            inlaws_email=get_field('inlaws_email'),
-            inlaws_address_line1=get_field('inlaws_address_line1'),
-            inlaws_address_city=get_field('inlaws_address_city'),
-            inlaws_address_state=get_field('inlaws_address_state'),
-            inlaws_address_zip=get_field('inlaws_address_zip'),
-            
-            # Educational information
-            high_school_info=get_field('high_school_info') or format_parsed_list(parse_school_info_simple(get_field('high_schools'))),
-            seminary_info=get_field('seminary_info') or format_parsed_list(parse_school_info_simple(get_field('seminaries'))),
-            college_attending=get_field('college_attending') or get_field('attending_college'),
-            college_name=get_field('college_name'),
-            college_major=get_field('college_major'),
-            college_expected_graduation=get_field('college_expected_graduation'),
-            
-            # Learning information
-            last_rebbe_name=get_field('last_rebbe_name') or get_field('rebbe_name'),
-            last_rebbe_phone=get_field('last_rebbe_phone') or get_field('rebbe_phone'),
-            gemora_sedorim_daily_count=get_field('gemora_sedorim_daily_count'),
-            gemora_sedorim_length=get_field('gemora_sedorim_length'),
-            learning_evaluation=get_field('learning_evaluation'),
-            
-            # Medical information
-            medical_conditions=get_field('medical_conditions') or get_field('medical_history'),
-            insurance_company=get_field('insurance_company'),
-            blood_type=get_field('blood_type'),
-            
-            # Activities/work
-            past_jobs=get_field('past_jobs') or get_field('work_history'),
-            summer_activities=get_field('summer_activities'),
-            
-            # Financial aid
-            tuition_payment_status=get_tuition_payment_status(),
-            amount_can_pay=get_numeric_field('amount_can_pay') or get_numeric_field('tuition_amount'),
-            scholarship_amount_requested=get_numeric_field('scholarship_amount_requested') or get_numeric_field('scholarship_amount'),
-            
-            # Other
-            dormitory_meals_option=get_field('dormitory_meals_option') or get_field('housing_preference'),
-            additional_info=get_field('additional_info') or get_field('comments') or get_field('notes')
-        )
+        kwargs = {
+            'id': str(uuid.uuid4()),
+            'division': division,
+            'submitted_date': datetime.utcnow(),
+            'status': 'Pending',
+        }
+        for attr, field_ids in _APPLICATION_FIELDS:
+            kwargs[attr] = next((nd[k] for k in field_ids if nd.get(k)), '')
+        
+        # Fields that are derived or need parsing
+        kwargs['student_name'] = get_field('student_name') or f"{kwargs['student_first_name']} {kwargs['student_last_name']}".strip()
+        kwargs['date_of_birth'] = parse_date_fields('date_of_birth') or parse_date(get_field('dob'))
+        kwargs['high_school_info'] = get_field('high_school_info') or format_parsed_list(parse_school_info_simple(get_field('high_schools')))
+        kwargs['seminary_info'] = get_field('seminary_info') or format_parsed_list(parse_school_info_simple(get_field('seminaries')))
+        kwargs['tuition_payment_status'] = get_tuition_payment_status()
+        kwargs['amount_can_pay'] = get_numeric_field('amount_can_pay') or get_numeric_field('tuition_amount')
+        kwargs['scholarship_amount_requested'] = get_numeric_field('scholarship_amount_requested') or get_numeric_field('scholarship_amount')
+        
+        application = Application(**kwargs)
         
         db.session.add(application)
         
@@ -293,7 +378,6 @@ def process_form_submission(data, division=None):
         
     except Exception as e:
         db.session.rollback()
-        last_webhook_error = str(e)
         current_app.logger.error(f"Error processing form submission: {str(e)}")
         raise
 
@@ -316,7 +400,7 @@ def process_file_uploads(application_id, file_data):
         elif isinstance(file_data, str):
             # It might be a JSON string
             try:
-                parsed = json.loads(file_data)
+                parsed = json_loads(file_data)
                 if isinstance(parsed, list):
                     files_to_process = parsed
                 elif isinstance(parsed, dict):
@@ -325,6 +409,9 @@ def process_file_uploads(application_id, file_data):
                 # If it's just a URL string
                 files_to_process = [{'url': file_data}]
         
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        os.makedirs(upload_folder, exist_ok=True)
+        
         for file_info in files_to_process:
             if not isinstance(file_info, dict):
                 continue
@@ -339,26 +426,35 @@ def process_file_uploads(application_id, file_data):
             
             # If no filename from URL, use a default
             if not filename:
-                filename = f"attachment_{uuid.uuid4().hex[:8]}"
+                filename = f"attachment_{secrets.token_hex(4)}"
             
             # Determine file type from extension
             file_extension = os.path.splitext(filename)[1].lower()
             file_type = 'document'
             
-            # Create a safe filename
-            safe_filename = f"{uuid.uuid4().hex}_{filename}"
-            upload_folder = current_app.config['UPLOAD_FOLDER']
-            os.makedirs(upload_folder, exist_ok=True)
-            file_path = os.path.join(upload_folder, safe_filename)
-            
             # Download the file
+            temp_path = None
             try:
-                response = requests.get(file_url, timeout=30)
+                response = _SESSION.get(file_url, timeout=30, stream=True)
                 response.raise_for_status()
                 
-                # Save the file
-                with open(file_path, 'wb') as f:
-                    f.write(response.content)
+                # Stream to a temporary file while hashing the content
+                digest = hashlib.sha256()
+                with tempfile.NamedTemporaryFile(dir=upload_folder, delete=False) as f:
+                    temp_path = f.name
+                    for chunk in response.iter_content(65536):
+                        f.write(chunk)
+                        digest.update(chunk)
+                
+                # Name the file by its content hash so duplicate uploads share one copy
+                safe_filename = f"{digest.hexdigest()[:16]}_{filename}"
+                file_path = os.path.join(upload_folder, safe_filename)
+                if os.path.exists(file_path):
+                    os.remove(temp_path)
+                else:
+                    os.chmod(temp_path, 0o666 & ~_UMASK)
+                    os.replace(temp_path, file_path)
+                temp_path = None
                 
                 # Get file type from content-type if available
                 content_type = response.headers.get('content-type', '')
@@ -378,6 +474,8 @@ def process_file_uploads(application_id, file_data):
                 db.session.add(attachment)
                 
             except Exception as e:
+                if temp_path and os.path.exists(temp_path):
+                    os.remove(temp_path)
                 current_app.logger.error(f"Error downloading file {file_url}: {str(e)}")
                 continue
         
@@ -404,7 +502,7 @@ def gravity_forms_webhook_yoh():
 
 def handle_webhook_request(division=None):
     """Common handler for all webhook requests."""
-    global last_webhook_data, last_webhook_error
+    debug_entry = None
     
     try:
         # Get raw data for signature verification
@@ -416,56 +514,76 @@ def handle_webhook_request(division=None):
             signature = request.headers.get('X-Webhook-Signature', '')
             if not verify_webhook_signature(raw_data, signature, webhook_secret):
                 current_app.logger.warning("Invalid webhook signature")
-                return jsonify({'error': 'Invalid signature'}), 401
+                return json_response({'error': 'Invalid signature'}, 401)
         
         # Parse the webhook data
-        if request.content_type == 'application/x-www-form-urlencoded':
+        if request.content_type == 'application/x-www-form-urlencoded' and raw_data.startswith(b'payload='):
+            # Gravity Forms JSON payload: decode just that field from the raw body
+            end = raw_data.find(b'&')
+            encoded = raw_data[8:] if end == -1 else raw_data[8:end]
+            webhook_data = json_loads(unquote_to_bytes(encoded.replace(b'+', b' ')))
+        elif request.content_type == 'application/x-www-form-urlencoded':
             # URL-encoded form data
             form_data = request.form.to_dict()
             
             # Check if there's a JSON payload in the form data
             if 'payload' in form_data:
-                webhook_data = json.loads(form_data['payload'])
+                webhook_data = json_loads(form_data['payload'])
             else:
                 webhook_data = form_data
         else:
             # JSON data
-            webhook_data = request.get_json()
+            webhook_data = get_request_json()
         
         # Store for debugging
-        last_webhook_data = webhook_data
-        last_webhook_error = None
+        debug_entry = record_webhook_event(webhook_data)
         
         # Log the webhook data for debugging
-        current_app.logger.info(f"Received webhook data: {json.dumps(webhook_data, indent=2)}")
+        current_app.logger.debug("Received webhook data: %s", LazyJSON(webhook_data))
         
         # Process the form submission
         application = process_form_submission(webhook_data, division)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'application_id': application.id,
             'message': 'Application created successfully'
-        }), 200
+        })
         
+    except ValueError as e:
+        # Malformed or incomplete submission
+        record_webhook_error(debug_entry, str(e))
+        current_app.logger.warning(f"Rejected webhook submission: {str(e)}")
+        return json_response({'error': str(e)}, 400)
     except Exception as e:
-        last_webhook_error = str(e)
+        record_webhook_error(debug_entry, str(e))
         current_app.logger.error(f"Error processing webhook: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 @webhooks.route('/webhook-debug')
 @login_required
 @permission_required('view_applications')
 def webhook_debug():
     """Display webhook debugging information."""
-    return render_template('webhook_debug.html', 
-                         last_webhook_data=last_webhook_data,
-                         last_webhook_error=last_webhook_error)
+    with _DEBUG_LOCK:
+        recent_webhooks = [dict(entry) for entry in _RECENT_WEBHOOKS]
+    return render_template('webhook_debug.html', recent_webhooks=recent_webhooks)
 
 @webhooks.route('/api/gravity-forms/webhook-debug', methods=['POST'])
 def gravity_forms_webhook_debug():
     """Debug endpoint to see raw webhook data."""
     try:
+        # Read the body once and derive every debug view from it
+        raw_data = request.get_data()
+        parsed_json = None
+        if raw_data.lstrip()[:1] in (b'{', b'['):
+            try:
+                parsed_json = json_loads(raw_data)
+            except ValueError:
+                pass
+        content_type = request.content_type or ''
+        form_data = request.form.to_dict() if 'form-urlencoded' in content_type or 'multipart/form-data' in content_type else {}
+        
         # Get all possible data formats
         debug_info = {
             'headers': dict(request.headers),
@@ -473,31 +591,31 @@ def gravity_forms_webhook_debug():
             'method': request.method,
             'url': request.url,
             'args': request.args.to_dict(),
-            'form': request.form.to_dict(),
-            'json': request.get_json(silent=True),
-            'data': request.get_data(as_text=True)
+            'form': form_data,
+            'json': parsed_json,
+            'data': raw_data.decode('utf-8', 'replace')
         }
         
         # Log it
-        current_app.logger.info(f"Webhook debug info: {json.dumps(debug_info, indent=2)}")
+        current_app.logger.debug("Webhook debug info: %s", LazyJSON(debug_info))
         
-        return jsonify({
+        return json_response({
             'success': True,
             'debug_info': debug_info
-        }), 200
+        })
         
     except Exception as e:
         current_app.logger.error(f"Error in webhook debug: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 @webhooks.route('/api/opensign/webhook', methods=['POST'])
 def opensign_webhook():
     """Handle OpenSign webhook notifications."""
     try:
-        data = request.get_json()
+        data = get_request_json()
         
         # Log the webhook data
-        current_app.logger.info(f"OpenSign webhook received: {json.dumps(data, indent=2)}")
+        current_app.logger.debug("OpenSign webhook received: %s", LazyJSON(data))
         
         # Extract event type and document info
         event_type = data.get('event')
@@ -505,10 +623,14 @@ def opensign_webhook():
         
         if event_type == 'document.completed':
             # Find the tuition contract associated with this document
-            from models import TuitionContract, Student, FinancialRecord, AcademicYear
+            from models import TuitionContract, Student, FinancialRecord
             
-            # Look for the contract with this OpenSign document ID
-            contract = TuitionContract.query.filter_by(opensign_document_id=document_id).first()
+            # Look for the contract with this OpenSign document ID, loading its
+            # student in the same round-trip
+            contract = (db.session.query(TuitionContract)
+                        .options(joinedload(TuitionContract.student))
+                        .filter_by(opensign_document_id=document_id)
+                        .first())
             
             if contract:
                 # Update contract status
@@ -525,11 +647,11 @@ def opensign_webhook():
                     contract.opensign_signed_url = data['signedDocumentUrl']
                 
                 # Also update FinancialRecord for backwards compatibility
-                current_year = AcademicYear.query.filter_by(is_active=True).first()
-                if current_year:
+                current_year_id = get_active_academic_year_id()
+                if current_year_id:
                     financial_record = FinancialRecord.query.filter_by(
                         student_id=contract.student_id,
-                        academic_year_id=current_year.id
+                        academic_year_id=current_year_id
                     ).first()
                     
                     if financial_record:
@@ -539,9 +661,9 @@ def opensign_webhook():
                         financial_record.enrollment_contract_received = True
                         financial_record.enrollment_contract_received_date = datetime.utcnow()
                 
-                # Also check for old Student model reference and update if exists
-                student = Student.query.filter_by(opensign_document_id=document_id).first()
-                if student:
+                # Also update the old Student model reference if it carries this document
+                student = contract.student
+                if student and getattr(student, 'opensign_document_id', None) == document_id:
                     student.tuition_contract_signed = True
                     student.tuition_contract_signed_date = datetime.utcnow()
                     if 'signedDocumentUrl' in data:
@@ -566,8 +688,8 @@ def opensign_webhook():
                 else:
                     current_app.logger.warning(f"No contract or student found for OpenSign document ID: {document_id}")
         
-        return jsonify({'success': True}), 200
+        return json_response({'success': True})
         
     except Exception as e:
         current_app.logger.error(f"Error processing OpenSign webhook: {str(e)}")
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return json_response({'error': str(e)}, 500) 
\ No newline at end of file
@@ -1,24 +1,68 @@
+import functools
 import os
-from datetime import timedelta
+import types
+
+# Maximum upload size in bytes (50MB)
+MAX_CONTENT_LENGTH = 50 * 1024 * 1024
+
+# Values accepted as "true" for boolean environment variables
+_TRUTHY = frozenset(('true', 'on', '1', 'yes'))
+
+# Snapshot of the environment, copied once at import as a plain dict so
+# lookups skip os.environ's per-call key encoding
+_ENV_SNAPSHOT = dict(os.environ)
+
+def _env(key, default=None):
+    """Get an environment value from the snapshot, falling back to default when unset."""
+    value = _ENV_SNAPSHOT.get(key)
+    return default if value is None else value
+
+def _envbool(key, default):
+    """Get an environment value from the snapshot as a boolean."""
+    return _env(key, default).lower() in _TRUTHY
+
+@functools.cache
+def _mail_port():
+    """Get the SMTP port as an integer, coerced once."""
+    return int(_env('MAIL_PORT', 587))
+
+class _LazyAttr:
+    """Class attribute computed on first access, then cached on the owning class."""
+    
+    def __init__(self, fn):
+        self.fn = fn
+    
+    def __set_name__(self, owner, name):
+        self._name = name
+    
+    def __get__(self, obj, cls):
+        value = self.fn()
+        setattr(cls, self._name, value)
+        return value
+
+def _session_lifetime():
+    """Build the session lifetime, importing datetime only when it is needed."""
+    from datetime import timedelta
+    return timedelta(days=7)
 
 class Config:
     # Basic Flask Configuration
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
+    SECRET_KEY = _env('SECRET_KEY') or 'dev-secret-key-change-in-production'
     
-    # Database Configuration
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///student_management.db'
+    # Database Configuration (unless FLASK_CONFIG_FILE sets it, the URI is set by
+    # create_app via resolve_db_uri)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Mail Configuration
-    MAIL_SERVER = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
-    MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
-    MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1']
-    MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
-    MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
-    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@yourdomain.com')
+    MAIL_SERVER = _env('MAIL_SERVER', 'smtp.gmail.com')
+    MAIL_PORT = _mail_port()
+    MAIL_USE_TLS = _envbool('MAIL_USE_TLS', 'true')
+    MAIL_USERNAME = _env('MAIL_USERNAME')
+    MAIL_PASSWORD = _env('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = _env('MAIL_DEFAULT_SENDER', 'noreply@yourdomain.com')
     
     # Session Configuration
-    PERMANENT_SESSION_LIFETIME = timedelta(days=7)
+    PERMANENT_SESSION_LIFETIME = _LazyAttr(_session_lifetime)
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
@@ -28,56 +72,87 @@ class Config:
     
     # Security Configuration
     WTF_CSRF_ENABLED = True
-    WTF_CSRF_SECRET_KEY = os.environ.get('WTF_CSRF_SECRET_KEY') or 'csrf-secret-key-change-in-production'
+    WTF_CSRF_SECRET_KEY = _env('WTF_CSRF_SECRET_KEY') or 'csrf-secret-key-change-in-production'
     
     # File Upload Configuration
-    MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB max file size
+    MAX_CONTENT_LENGTH = MAX_CONTENT_LENGTH  # 50MB max file size
     UPLOAD_FOLDER = 'uploads'
     
     # Dropbox Configuration
-    DROPBOX_ACCESS_TOKEN = os.environ.get('DROPBOX_ACCESS_TOKEN')
-    DROPBOX_APP_KEY = os.environ.get('DROPBOX_APP_KEY')
-    DROPBOX_APP_SECRET = os.environ.get('DROPBOX_APP_SECRET')
-    DROPBOX_FOLDER_PREFIX = os.environ.get('DROPBOX_FOLDER_PREFIX', '/StudentManagement')
-    USE_DROPBOX_STORAGE = os.environ.get('USE_DROPBOX_STORAGE', 'false').lower() in ['true', '1', 'yes']
+    DROPBOX_ACCESS_TOKEN = _env('DROPBOX_ACCESS_TOKEN')
+    DROPBOX_APP_KEY = _env('DROPBOX_APP_KEY')
+    DROPBOX_APP_SECRET = _env('DROPBOX_APP_SECRET')
+    DROPBOX_FOLDER_PREFIX = _env('DROPBOX_FOLDER_PREFIX', '/StudentManagement')
+    USE_DROPBOX_STORAGE = _envbool('USE_DROPBOX_STORAGE', 'false')
     
     # Dropbox Sign Configuration
-    DROPBOX_SIGN_API_KEY = os.environ.get('DROPBOX_SIGN_API_KEY')
-    DROPBOX_SIGN_CLIENT_ID = os.environ.get('DROPBOX_SIGN_CLIENT_ID')
-    DROPBOX_SIGN_TEST_MODE = os.environ.get('DROPBOX_SIGN_TEST_MODE', 'true').lower() in ['true', '1', 'yes']
-    DROPBOX_SIGN_WEBHOOK_SECRET = os.environ.get('DROPBOX_SIGN_WEBHOOK_SECRET')
+    DROPBOX_SIGN_API_KEY = _env('DROPBOX_SIGN_API_KEY')
+    DROPBOX_SIGN_CLIENT_ID = _env('DROPBOX_SIGN_CLIENT_ID')
+    DROPBOX_SIGN_TEST_MODE = _envbool('DROPBOX_SIGN_TEST_MODE', 'true')
+    DROPBOX_SIGN_WEBHOOK_SECRET = _env('DROPBOX_SIGN_WEBHOOK_SECRET')
     
     # Admire Billing System Configuration
-    ADMIRE_API_URL = os.environ.get('ADMIRE_API_URL', 'https://api.admire.example.com')
-    ADMIRE_API_KEY = os.environ.get('ADMIRE_API_KEY')
-    ADMIRE_API_SECRET = os.environ.get('ADMIRE_API_SECRET')
-    ADMIRE_ENVIRONMENT = os.environ.get('ADMIRE_ENVIRONMENT', 'sandbox')
-    ADMIRE_WEBHOOK_SECRET = os.environ.get('ADMIRE_WEBHOOK_SECRET')
+    ADMIRE_API_URL = _env('ADMIRE_API_URL', 'https://api.admire.example.com')
+    ADMIRE_API_KEY = _env('ADMIRE_API_KEY')
+    ADMIRE_API_SECRET = _env('ADMIRE_API_SECRET')
+    ADMIRE_ENVIRONMENT = _env('ADMIRE_ENVIRONMENT', 'sandbox')
+    ADMIRE_WEBHOOK_SECRET = _env('ADMIRE_WEBHOOK_SECRET')
+    
+    @staticmethod
+    def resolve_db_uri(profile):
+        """Resolve the database URI for a profile from the environment at call time."""
+        if profile == 'testing':
+            return 'sqlite:///:memory:'
+        if profile == 'development':
+            # Use instance folder for database (Flask best practice)
+            return f'sqlite:///{os.path.abspath("instance/student_management_dev.db")}'
+        database_url = os.environ.get('DATABASE_URL')
+        if profile == 'production' and not database_url:
+            raise RuntimeError('DATABASE_URL must be set for the production configuration')
+        return database_url or 'sqlite:///student_management.db'
+
+# Settings each profile overrides on top of Config, as
+# profile name -> (class name, attribute overrides factory)
+_PROFILES = {
+    'development': ('DevelopmentConfig', lambda: {
+        'DEBUG': True,
+        'SESSION_COOKIE_SECURE': False,
+        # Server configuration for URL generation
+        'SERVER_NAME': 'localhost:5000',
+        'PREFERRED_URL_SCHEME': 'http',
+    }),
+    'production': ('ProductionConfig', lambda: {
+        'DEBUG': False,
+        # In production, make sure to set these environment variables
+        'SECRET_KEY': _env('SECRET_KEY'),
+        'WTF_CSRF_SECRET_KEY': _env('WTF_CSRF_SECRET_KEY'),
+    }),
+    'testing': ('TestingConfig', lambda: {
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+    }),
+}
 
-class DevelopmentConfig(Config):
-    DEBUG = True
-    SESSION_COOKIE_SECURE = False
-    # Use instance folder for database (Flask best practice)
-    SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.abspath("instance/student_management_dev.db")}'
-    # Server configuration for URL generation
-    SERVER_NAME = 'localhost:5000'
-    PREFERRED_URL_SCHEME = 'http'
+# Profile config classes built so far
+_built = {}
 
-class ProductionConfig(Config):
-    DEBUG = False
-    # In production, make sure to set these environment variables
-    SECRET_KEY = os.environ.get('SECRET_KEY')
-    WTF_CSRF_SECRET_KEY = os.environ.get('WTF_CSRF_SECRET_KEY')
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+def _build(name):
+    """Build the config class for a profile on first use."""
+    if name not in _built:
+        class_name, overrides = _PROFILES[name]
+        _built[name] = type(class_name, (Config,), overrides())
+    return _built[name]
 
-class TestingConfig(Config):
-    TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
-    WTF_CSRF_ENABLED = False
+def __getattr__(attr):
+    """Build DevelopmentConfig/ProductionConfig/TestingConfig on first import or lookup."""
+    for name, (class_name, _) in _PROFILES.items():
+        if class_name == attr:
+            return _build(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
 
-config = {
-    'development': DevelopmentConfig,
-    'production': ProductionConfig,
-    'testing': TestingConfig,
-    'default': DevelopmentConfig
-} 
\ No newline at end of file
+config = types.MappingProxyType({
+    'development': lambda: _build('development'),
+    'production': lambda: _build('production'),
+    'testing': lambda: _build('testing'),
+    'default': lambda: _build('development')
+})
@@ -8,40 +8,213 @@ Addresses new formatting requirements:
 5. ADDED: Fillable AcroForm fields for dynamic data entry
 """
 
+from reportlab import rl_config
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
+from reportlab.lib.utils import simpleSplit
 from reportlab.pdfgen import canvas
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+import functools
+import io
+import multiprocessing
+import multiprocessing.spawn
 import os
+import re
+import string
+
+# Translation table that drops every ASCII character not allowed in contract filenames
+_FILENAME_ALLOWED = frozenset(string.ascii_letters + string.digits + ' -_')
+_FILENAME_SANITIZE_TABLE = str.maketrans('', '', ''.join(chr(c) for c in range(128) if chr(c) not in _FILENAME_ALLOWED))
+
+# Blank underlines for the static (non-fillable) contract fields
+_UNDERLINE_8 = '_' * 8
+_UNDERLINE_10 = '_' * 10
+_UNDERLINE_15 = '_' * 15
+_UNDERLINE_20 = '_' * 20
+_UNDERLINE_25 = '_' * 25
+_UNDERLINE_35 = '_' * 35
+_UNDERLINE_40 = '_' * 40
+_UNDERLINE_45 = '_' * 45
+_UNDERLINE_50 = '_' * 50
+
+# Dollar signs and thousands separators stripped before parsing money strings
+_MONEY_RE = re.compile(r'[$,]')
+
+@functools.lru_cache(maxsize=512)
+def _fmt_amount(amount):
+    """Format a float as 1,234.56; schedules repeat the same few amounts, so results are cached"""
+    return format(amount, ',.2f')
+
+# "September 1, 2025" style due dates; other formats are shown unchanged
+_DUE_DATE_RE = re.compile(r'^([A-Za-z]+)\s+\d+,\s*(\d{4})\s*$')
+
+# Division code -> (letterhead school name, school name used in running text)
+_DIVISION_NAMES = {
+    'YOH': ('YESHIVA OHR HATZAFON', 'Yeshiva Ohr Hatzafon'),
+    'KOLLEL': ('KOLLEL NER YEHOSHUA', 'Kollel Ner Yehoshua'),
+    'YZA': ('YESHIVA ZICHRON ARYEH', 'Yeshiva Zichron Aryeh'),
+}
+
+# Important-notes lines; only the division name varies between contracts
+_NOTES_LINES = (
+    "• Please do not modify this contract in any way",
+    "• If you have any questions or concerns please contact the financial office",
+    "• Checks should be mailed to {division}, PO Box 486, Cedarhurst, NY 11516",
+)
+_NOTES_TEMPLATE = "<br/>".join(_NOTES_LINES)
+
+# Agreement wording; only the academic year and division name vary between contracts
+_AGREEMENT_TEMPLATE = (
+    "I hereby enroll my son for the {year} academic year in {division}. "
+    "I understand that this is a binding obligation toward the Yeshiva and that I will be responsible for "
+    "satisfaction of his tuition obligation as well as all costs incurred by my son, including damage caused "
+    "to the Yeshiva property. With my signature I hereby accept the terms of this contract and authorize "
+    "all payments required herein."
+)
+
+@functools.lru_cache(maxsize=32)
+def _agreement_frags(year, division, style):
+    """Parse the agreement markup once per (year, division, style)
+    
+    Only the parsed fragments are cached: each contract still gets its own
+    Paragraph, since wrap/split keep per-document layout state on it.
+    """
+    return Paragraph(_AGREEMENT_TEMPLATE.format(year=year, division=division), style).frags
+
+# Shared table styles for the page 1 layout (TableStyle is not modified by Table.setStyle)
+_PAYMENT_TABLE_STYLE = TableStyle([
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+])
+
+_REG_FEE_TABLE_STYLE = TableStyle([
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 2),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+])
+
+_COMPACT_TABLE_STYLE = TableStyle([
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 2),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+])
+
+_SIGNATURE_TABLE_STYLE = TableStyle([
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+
+# Page 2 table styles (tuition breakdown with shaded total row, payment schedule)
+_BREAKDOWN_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+])
+
+_SCHEDULE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
+
+# Lowest y the fixed-position canvas layout may draw at (the 0.5" bottom margin)
+_DIRECT_BOTTOM_MARGIN = 0.5 * inch
+
+class _DirectLayoutOverflow(Exception):
+    """Raised when the fixed-position canvas layout would run past the bottom margin"""
+
+def _require_direct_space(y, height):
+    """Raise _DirectLayoutOverflow unless a block extending height below y stays above the bottom margin"""
+    if y - height < _DIRECT_BOTTOM_MARGIN:
+        raise _DirectLayoutOverflow()
+
+class _FormCanvas(canvas.Canvas):
+    """Canvas that queues AcroForm widgets during layout and adds a page's widgets together when it ends"""
+    def __init__(self, *args, **kwargs):
+        canvas.Canvas.__init__(self, *args, **kwargs)
+        self._pending_fields = []
+
+    def _flush_form_fields(self):
+        form = self.acroForm
+        for kind, x, y, options in self._pending_fields:
+            getattr(form, kind)(x=x, y=y, **options)
+        self._pending_fields.clear()
+
+    def showPage(self):
+        self._flush_form_fields()
+        canvas.Canvas.showPage(self)
+
+def _add_form_field(canv, kind, **options):
+    """Add an AcroForm 'textfield' or 'checkbox' at the current origin
+    
+    On a _FormCanvas the widget is queued at its absolute position until the page
+    ends; any other canvas gets it immediately.
+    """
+    x, y = canv.absolutePosition(0, 0)
+    pending = getattr(canv, '_pending_fields', None)
+    if pending is None:
+        getattr(canv.acroForm, kind)(x=x, y=y, **options)
+    else:
+        pending.append((kind, x, y, options))
 
 # AcroForm field classes for fillable PDFs
 class FormTextField(Flowable):
     """Fillable text field for PDFs"""
+    kwargs = {}  # shared empty default; only fields with extra options get their own dict
+    
     def __init__(self, name, value="", width=150, height=20, **kwargs):
         Flowable.__init__(self)
         self.width = width
         self.height = height
         self.name = name
         self.value = str(value) if value else ""
-        self.kwargs = kwargs
+        if kwargs:
+            self.kwargs = kwargs
 
     def draw(self):
-        # Draw a very faint blue background for subtle visual indication
-        self.canv.setFillColor(colors.Color(0.95, 0.97, 1.0, alpha=0.3))  # Very light blue with transparency
-        self.canv.rect(0, 0, self.width, self.height, fill=1, stroke=0)
-        
         # Draw a subtle bottom line for visual guidance when printed
         self.canv.setStrokeColor(colors.black)
         self.canv.setLineWidth(0.5)
         self.canv.line(0, 0, self.width, 0)  # Bottom line only
         
-        # Create the form field with minimal styling
-        form = self.canv.acroForm
-        form.textfieldRelative(
+        # Queue the form field with minimal styling; its fillColor provides the faint background
+        _add_form_field(
+            self.canv,
+            'textfield',
             name=self.name,
             value=self.value,
             width=self.width,
@@ -57,27 +230,27 @@ class FormTextField(Flowable):
 
 class FormCheckbox(Flowable):
     """Fillable checkbox for PDFs"""
+    kwargs = {}  # shared empty default; only checkboxes with extra options get their own dict
+    
     def __init__(self, name, checked=False, size=12, **kwargs):
         Flowable.__init__(self)
         self.width = size
         self.height = size
         self.name = name
         self.checked = checked
-        self.kwargs = kwargs
+        if kwargs:
+            self.kwargs = kwargs
 
     def draw(self):
-        # Draw a very faint blue background for subtle visual indication
-        self.canv.setFillColor(colors.Color(0.95, 0.97, 1.0, alpha=0.3))
-        self.canv.rect(0, 0, self.width, self.height, fill=1, stroke=0)
-        
         # Draw a subtle square border for visual guidance when printed
         self.canv.setStrokeColor(colors.black)
         self.canv.setLineWidth(0.5)
         self.canv.rect(0, 0, self.width, self.height, fill=0)  # Empty square border
         
-        # Create the form field with minimal styling
-        form = self.canv.acroForm
-        form.checkboxRelative(
+        # Queue the form field with minimal styling; its fillColor provides the faint background
+        _add_form_field(
+            self.canv,
+            'checkbox',
             name=self.name,
             checked=self.checked,
             size=self.width,
@@ -88,6 +261,10 @@ class FormCheckbox(Flowable):
             **self.kwargs
         )
 
+def make_text(name, value='', w=150, h=16):
+    """Build a plain FormTextField (no extra AcroForm options) with the contract's default row size"""
+    return FormTextField(name, value, w, h)
+
 class CheckboxWithText(Flowable):
     """Flowable that combines a checkbox with text, positioned at left margin"""
     def __init__(self, checkbox_name, text, checked=False, size=12, text_style=None):
@@ -101,10 +278,6 @@ class CheckboxWithText(Flowable):
         self.height = 16  # Height for the line
         
     def draw(self):
-        # Draw a very faint blue background for the checkbox only
-        self.canv.setFillColor(colors.Color(0.95, 0.97, 1.0, alpha=0.3))
-        self.canv.rect(0, 2, self.size, self.size, fill=1, stroke=0)
-        
         # Draw a subtle checkbox square for visual guidance when printed
         self.canv.setStrokeColor(colors.black)
         self.canv.setLineWidth(0.5)
@@ -116,9 +289,10 @@ class CheckboxWithText(Flowable):
         self.canv.setFont('Helvetica-Bold', 10)
         self.canv.drawString(self.size + 6, 4, self.text)  # Slightly adjusted position
         
-        # Draw the checkbox form field at the very left (no offset)
-        form = self.canv.acroForm
-        form.checkboxRelative(
+        # Queue the checkbox form field at the very left (no offset)
+        _add_form_field(
+            self.canv,
+            'checkbox',
             name=self.checkbox_name,
             checked=self.checked,
             size=self.size,
@@ -129,78 +303,106 @@ class CheckboxWithText(Flowable):
         )
 
 class ContractStructureService:
+    # Stylesheet shared by all instances, built on first instantiation
+    _cached_styles = None
+    
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        if ContractStructureService._cached_styles is None:
+            self.styles = getSampleStyleSheet()
+            self._setup_custom_styles()
+            ContractStructureService._cached_styles = self.styles
+        self.styles = ContractStructureService._cached_styles
     
     def _setup_custom_styles(self):
-        """Setup custom paragraph styles"""
+        """Setup custom paragraph styles (skips styles that are already registered)"""
         # Title style
-        self.styles.add(ParagraphStyle(
-            name='ContractTitle',
-            parent=self.styles['Title'],
-            fontSize=16,
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
+        if 'ContractTitle' not in self.styles:
+            self.styles.add(ParagraphStyle(
+                name='ContractTitle',
+                parent=self.styles['Title'],
+                fontSize=16,
+                spaceAfter=12,
+                alignment=TA_CENTER,
+                fontName='Helvetica-Bold'
+            ))
         
         # Section header style
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            fontName='Helvetica-Bold',
-            spaceAfter=6,
-            spaceBefore=12
-        ))
+        if 'SectionHeader' not in self.styles:
+            self.styles.add(ParagraphStyle(
+                name='SectionHeader',
+                parent=self.styles['Heading2'],
+                fontSize=12,
+                fontName='Helvetica-Bold',
+                spaceAfter=6,
+                spaceBefore=12
+            ))
         
         # Compact text style for tight spacing
-        self.styles.add(ParagraphStyle(
-            name='CompactText',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=3,
-            spaceBefore=0
-        ))
+        if 'CompactText' not in self.styles:
+            self.styles.add(ParagraphStyle(
+                name='CompactText',
+                parent=self.styles['Normal'],
+                fontSize=10,
+                spaceAfter=3,
+                spaceBefore=0
+            ))
         
         # Form field style
-        self.styles.add(ParagraphStyle(
-            name='FormField',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            spaceAfter=2,
-            spaceBefore=2
-        ))
+        if 'FormField' not in self.styles:
+            self.styles.add(ParagraphStyle(
+                name='FormField',
+                parent=self.styles['Normal'],
+                fontSize=10,
+                spaceAfter=2,
+                spaceBefore=2
+            ))
         
         # Small text style for agreement
-        self.styles.add(ParagraphStyle(
-            name='SmallText',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            spaceAfter=2,
-            spaceBefore=0
-        ))
-
-    def format_currency(self, amount):
+        if 'SmallText' not in self.styles:
+            self.styles.add(ParagraphStyle(
+                name='SmallText',
+                parent=self.styles['Normal'],
+                fontSize=8,
+                spaceAfter=2,
+                spaceBefore=0
+            ))
+
+    @staticmethod
+    def format_currency(amount):
         """Format currency with comma separators, no dollar sign in individual fields"""
         if isinstance(amount, (int, float)):
             return f"{amount:,.2f}".rstrip('0').rstrip('.')
         return str(amount)
 
-    def format_currency_with_dollar(self, amount):
+    @staticmethod
+    def format_currency_with_dollar(amount):
         """Format currency with dollar sign for totals"""
-        if isinstance(amount, (int, float)):
-            formatted = f"{amount:,.2f}".rstrip('0').rstrip('.')
-            return f"${formatted}"
-        return f"${amount}"
+        return f"${ContractStructureService.format_currency(amount)}"
+
+    @staticmethod
+    def _to_float(value):
+        """Convert a number or a "$1,234.56" style string to float, or None if it cannot be parsed"""
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return float(_MONEY_RE.sub('', value))
+            except ValueError:
+                return None
+        return None
 
-    def create_yza_contract(self, data, output_path=None, fillable=True):
-        """Create YZA enrollment contract with improved formatting and optional fillable fields"""
+    def create_yza_contract(self, data, output_path=None, fillable=True, debug=False, use_canvas=False):
+        """Create YZA enrollment contract with improved formatting and optional fillable fields
+        
+        ReportLab shape checking is switched off while building unless debug is True.
+        With use_canvas=True both pages are drawn directly on a canvas at fixed
+        positions, skipping the platypus layout pass; data too long for that
+        two-page layout falls back to platypus, which paginates it.
+        """
         try:
             # Generate filename
             student_name = data.get('student_name', 'Unknown_Student')
-            clean_name = "".join(c for c in student_name if c.isalnum() or c in (' ', '-', '_')).replace(' ', '_')
+            clean_name = student_name.translate(_FILENAME_SANITIZE_TABLE).replace(' ', '_')
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
             if output_path:
@@ -217,30 +419,21 @@ class ContractStructureService:
                 os.makedirs(contracts_dir, exist_ok=True)
                 filepath = os.path.join(contracts_dir, filename)
             
-            # Create PDF document
-            doc = SimpleDocTemplate(
-                filepath,
-                pagesize=letter,
-                rightMargin=0.5*inch,
-                leftMargin=0.5*inch,
-                topMargin=0.5*inch,
-                bottomMargin=0.5*inch
-            )
-            
-            # Build content
-            story = []
-        
-            # PAGE 1 - Contract Terms and Payment Information
-            story.extend(self._create_page1_content(data, fillable=fillable))
+            previous_shape_checking = rl_config.shapeChecking
+            if not debug:
+                rl_config.shapeChecking = 0
+            try:
+                # Render into memory and write the file in one go
+                buffer = io.BytesIO()
+                if use_canvas:
+                    self._build_direct(buffer, data, fillable=fillable)
+                else:
+                    self._build_platypus(buffer, data, fillable=fillable)
+            finally:
+                rl_config.shapeChecking = previous_shape_checking
             
-            # PAGE BREAK
-            story.append(PageBreak())
-        
-            # PAGE 2 - Tuition Breakdown and Payment Schedule
-            story.extend(self._create_page2_content(data, fillable=fillable))
-        
-            # Build PDF
-            doc.build(story)
+            with open(filepath, 'wb') as f:
+                f.write(buffer.getbuffer())
             
             print(f"✅ Enhanced YZA Contract created ({'fillable' if fillable else 'static'}): {os.path.abspath(filepath)}")
             return filepath
@@ -249,54 +442,156 @@ class ContractStructureService:
             print(f"❌ Error creating contract: {str(e)}")
             raise
 
+    def _build_platypus(self, output, data, fillable=True):
+        """Lay out both pages with platypus flowables and write the PDF to output (path or file object)"""
+        # Create PDF document
+        doc = SimpleDocTemplate(
+            output,
+            pagesize=letter,
+            rightMargin=0.5*inch,
+            leftMargin=0.5*inch,
+            topMargin=0.5*inch,
+            bottomMargin=0.5*inch
+        )
+        
+        # Build content
+        story = []
+        
+        # PAGE 1 - Contract Terms and Payment Information
+        story.extend(self._create_page1_content(data, fillable=fillable))
+        
+        # PAGE BREAK
+        story.append(PageBreak())
+        
+        # PAGE 2 - Tuition Breakdown and Payment Schedule
+        story.extend(self._create_page2_content(data, fillable=fillable))
+        
+        # Build PDF in a single pass (no onPage callbacks, no TOC/index flowables);
+        # form fields are added per page by _FormCanvas
+        doc.build(story, canvasmaker=_FormCanvas)
+
+    def _build_direct(self, output, data, fillable=True):
+        """Draw both pages directly on a canvas and write the PDF to output (path or file object)
+        
+        Nothing is written until save(), so when a block would not fit above the
+        bottom margin the canvas is discarded and platypus lays the contract out.
+        """
+        c = canvas.Canvas(output, pagesize=letter)
+        try:
+            self._draw_page1_direct(c, data, fillable=fillable)
+            c.showPage()
+            self._draw_page2_direct(c, data, fillable=fillable)
+            c.showPage()
+        except _DirectLayoutOverflow:
+            self._build_platypus(output, data, fillable=fillable)
+            return
+        c.save()
+
+    def create_yza_contracts_batch(self, data_list, output_paths=None, fillable=True, max_workers=4, debug=False,
+                                   use_canvas=False, use_processes=False, python_executable=None):
+        """Create several contracts concurrently
+        
+        Returns a list of (index, filepath or Exception) tuples ordered by index, so
+        one failing record does not abort the rest of the batch.
+        
+        With use_processes=True the contracts are built in a spawned process pool
+        instead of threads, so the pure-Python ReportLab layout is not serialized by
+        the GIL. python_executable (e.g. a pypy3 binary with reportlab installed)
+        runs those workers under another interpreter; the previous spawn executable
+        is restored once the pool has shut down.
+        """
+        if output_paths is None:
+            output_paths = [None] * len(data_list)
+        
+        previous_executable = None
+        if use_processes:
+            context = multiprocessing.get_context('spawn')
+            if python_executable:
+                previous_executable = multiprocessing.spawn.get_executable()
+                context.set_executable(python_executable)
+            executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+            build = functools.partial(_build_contract_in_worker, fillable=fillable, debug=debug,
+                                      use_canvas=use_canvas)
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            build = functools.partial(self.create_yza_contract, fillable=fillable,
+                                      debug=True, use_canvas=use_canvas)  # shape checking set below
+        
+        # Toggle shape checking once for the whole batch rather than per thread
+        previous_shape_checking = rl_config.shapeChecking
+        if not debug:
+            rl_config.shapeChecking = 0
+        try:
+            results = []
+            with executor:
+                futures = {
+                    executor.submit(build, data, output_path): index
+                    for index, (data, output_path) in enumerate(zip(data_list, output_paths))
+                }
+                for future in as_completed(futures):
+                    try:
+                        results.append((futures[future], future.result()))
+                    except Exception as e:
+                        results.append((futures[future], e))
+        finally:
+            rl_config.shapeChecking = previous_shape_checking
+            # Workers are all started by now, so later spawn pools get the old interpreter back
+            if previous_executable is not None:
+                multiprocessing.spawn.set_executable(previous_executable)
+        
+        return sorted(results, key=lambda result: result[0])
+
+    @staticmethod
+    def _field(name, value='', w=150, h=16, fillable=True, blank=_UNDERLINE_25):
+        """Return a fillable text field, or the static underline that stands in for it"""
+        return make_text(name, value, w, h) if fillable else blank
+
+    def _option_header(self, checkbox_name, label, fillable=True):
+        """Return a payment option heading: fillable checkbox with label, or a static ☐ line"""
+        if fillable:
+            return CheckboxWithText(checkbox_name, label, size=12)
+        return Paragraph(f"<b>☐ {label}</b>", self.styles['CompactText'])
+
     def _create_page1_content(self, data, fillable=True):
         """Create Page 1 content - Contract terms and payment info"""
         content = []
         
+        # Bind the styles used below to locals
+        title = self.styles['ContractTitle']
+        header = self.styles['SectionHeader']
+        compact = self.styles['CompactText']
+        small = self.styles['SmallText']
+        
         # Header - Dynamic based on division
-        division = data.get('division', 'YZA')
-        if division == 'YOH':
-            school_name = "YESHIVA OHR HATZAFON"
-        elif division == 'KOLLEL':
-            school_name = "KOLLEL NER YEHOSHUA"
-        else:  # YZA or default
-            school_name = "YESHIVA ZICHRON ARYEH"
-        
-        content.append(Paragraph(school_name, self.styles['ContractTitle']))
-        content.append(Paragraph("ENROLLMENT CONTRACT", self.styles['ContractTitle']))
+        school_name, division_name = _DIVISION_NAMES.get(data.get('division', 'YZA'), _DIVISION_NAMES['YZA'])
+        
+        content.append(Paragraph(school_name, title))
+        content.append(Paragraph("ENROLLMENT CONTRACT", title))
         content.append(Spacer(1, 8))
         
         # Student name and academic year aligned with section headers
-        student_name = data.get('student_name', '_' * 40)
+        student_name = data.get('student_name', _UNDERLINE_40)
         academic_year = data.get('academic_year', '2024-2025')
         
         # Use Paragraph elements to match section header alignment exactly
         # Make Student Name line bigger with font size 12
-        content.append(Paragraph(f'<font size="12"><b>Student Name:</b> {student_name}</font>', self.styles['CompactText']))
+        content.append(Paragraph(f'<font size="12"><b>Student Name:</b> {student_name}</font>', compact))
         content.append(Spacer(1, 4))
-        content.append(Paragraph(f"<b>Academic Year:</b> {academic_year}", self.styles['CompactText']))
+        content.append(Paragraph(f"<b>Academic Year:</b> {academic_year}", compact))
         content.append(Spacer(1, 8))
         
         # Payment Terms Section
-        content.append(Paragraph("PAYMENT TERMS", self.styles['SectionHeader']))
+        content.append(Paragraph("PAYMENT TERMS", header))
         
         # Get registration fee option and payment details
         registration_option = data.get('registration_fee_option', 'upfront')
         registration_rolled_in = data.get('registration_rolled_in', False) or registration_option == 'rolled'
         
-        # Format total_amount with comma separators
+        # Parse total_amount once, then format it with comma separators
         total_amount = data.get('total_amount', '$0.00')
-        if isinstance(total_amount, (int, float)):
-            total_amount = f"${total_amount:,.2f}"
-        elif isinstance(total_amount, str):
-            # If it's a string, extract the numeric value and reformat with commas
-            try:
-                # Remove $ and commas, convert to float, then reformat
-                numeric_value = float(total_amount.replace('$', '').replace(',', ''))
-                total_amount = f"${numeric_value:,.2f}"
-            except (ValueError, TypeError):
-                # If conversion fails, keep original value
-                pass
+        total_numeric = self._to_float(total_amount)
+        if total_numeric is not None:
+            total_amount = f"${_fmt_amount(total_numeric)}"
         
         # Payment terms with checkboxes (fillable or static)
         if fillable:
@@ -308,14 +603,7 @@ class ContractStructureService:
                      "Registration Fee: ROLLED INTO TUITION PAYMENTS"]
                 ]
                 payment_table = Table(payment_terms_data, colWidths=[0.3*inch, 5.7*inch])
-                payment_table.setStyle(TableStyle([
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                    ('TOPPADDING', (0, 0), (-1, -1), 3),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-                ]))
+                payment_table.setStyle(_PAYMENT_TABLE_STYLE)
                 content.append(payment_table)
             else:
                 # Registration fee should be static, not fillable - align with field labels
@@ -323,14 +611,7 @@ class ContractStructureService:
                     ["Registration Fee:", data.get('registration_fee', '$750.00'), "- Due at contract signing", ""]
                 ]
                 reg_fee_table = Table(reg_fee_data, colWidths=[1.3*inch, 2.2*inch, 1*inch, 1.5*inch])
-                reg_fee_table.setStyle(TableStyle([
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                    ('TOPPADDING', (0, 0), (-1, -1), 2),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-                ]))
+                reg_fee_table.setStyle(_REG_FEE_TABLE_STYLE)
                 content.append(reg_fee_table)
                 
                 # Add payment method checkboxes only when registration fee is NOT rolled in
@@ -341,38 +622,31 @@ class ContractStructureService:
                      "Check enclosed"]
                 ]
                 payment_table = Table(payment_terms_data, colWidths=[0.3*inch, 2.5*inch, 0.3*inch, 2*inch])
-                payment_table.setStyle(TableStyle([
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                    ('TOPPADDING', (0, 0), (-1, -1), 3),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-                ]))
+                payment_table.setStyle(_PAYMENT_TABLE_STYLE)
                 content.append(payment_table)
         else:
             # Static version
             if registration_rolled_in:
                 # When registration fee is rolled in, only show the rolled-in message
                 payment_terms_text = "☐ Registration Fee: ROLLED INTO TUITION PAYMENTS"
-                content.append(Paragraph(payment_terms_text, self.styles['CompactText']))
+                content.append(Paragraph(payment_terms_text, compact))
             else:
                 # Create separate paragraphs to prevent overlapping
                 reg_fee_text = f"Registration Fee: {data.get('registration_fee', '$750.00')} - Due at contract signing"
-                content.append(Paragraph(reg_fee_text, self.styles['CompactText']))
+                content.append(Paragraph(reg_fee_text, compact))
                 # Add payment method checkboxes only when registration fee is NOT rolled in
                 payment_terms_text = "☐ Use payment method below ☐ Check enclosed"
-                content.append(Paragraph(payment_terms_text, self.styles['CompactText']))
+                content.append(Paragraph(payment_terms_text, compact))
         
         content.append(Spacer(1, 6))
         
         # Tuition Total with note (should be static, not fillable)
-        content.append(Paragraph(f"<b>TUITION TOTAL: {total_amount}</b>", self.styles['CompactText']))
-        content.append(Paragraph("<i>See payment schedule and breakdown details on page 2</i>", self.styles['CompactText']))
+        content.append(Paragraph(f"<b>TUITION TOTAL: {total_amount}</b>", compact))
+        content.append(Paragraph("<i>See payment schedule and breakdown details on page 2</i>", compact))
         content.append(Spacer(1, 8))
         
         # Payment Method Section
-        content.append(Paragraph("PAYMENT METHOD", self.styles['SectionHeader']))
+        content.append(Paragraph("PAYMENT METHOD", header))
         
         # Calculate dynamic values for check payment option
         num_payments = len(data.get('payment_schedule', []))
@@ -380,232 +654,88 @@ class ContractStructureService:
             num_payments = 10  # default
         
         # Calculate monthly payment amount
-        try:
-            if isinstance(total_amount, str):
-                # Remove $ and commas, convert to float
-                total_numeric = float(total_amount.replace('$', '').replace(',', ''))
-            else:
-                total_numeric = float(total_amount)
+        if total_numeric is not None:
             monthly_amount = total_numeric / num_payments if num_payments > 0 else 0
-            monthly_amount_str = f"${monthly_amount:,.2f}"
-        except (ValueError, TypeError):
+            monthly_amount_str = f"${_fmt_amount(monthly_amount)}"
+        else:
             monthly_amount_str = "$0.00"
         
-        if fillable:
-            # Fillable Payment Method Section
-            
-            # Credit Card Section with checkbox aligned to left margin
-            content.append(CheckboxWithText('payment_method_credit_card', 'Credit Card', size=12))
-            content.append(Spacer(1, 4))
-            
-            cc_data = [
-                ["Card Number:", FormTextField(name='cc_number', value=data.get('cc_number', ''), width=150, height=16), 
-                 "Exp Date:", FormTextField(name='cc_exp_date', value=data.get('cc_exp_date', ''), width=60, height=16)],
-                ["Cardholder Name:", FormTextField(name='cc_holder_name', value=data.get('cc_holder_name', ''), width=150, height=16), 
-                 "CVV:", FormTextField(name='cc_cvv', value=data.get('cc_cvv', ''), width=40, height=16)],
-                ["Billing ZIP:", FormTextField(name='cc_zip', value=data.get('cc_zip', ''), width=80, height=16), 
-                 "Charge Date:", FormTextField(name='cc_charge_date', value=data.get('cc_charge_date', ''), width=80, height=16)]
-            ]
-            cc_table = Table(cc_data, colWidths=[1.3*inch, 2.5*inch, 0.8*inch, 1.4*inch])
-            cc_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content.append(cc_table)
-            content.append(Spacer(1, 6))
-            
-            # ACH/Bank Transfer Section with checkbox aligned to left margin
-            content.append(CheckboxWithText('payment_method_ach', 'ACH/Bank Transfer', size=12))
-            content.append(Spacer(1, 3))
-            
-            ach_data = [
-                ["Routing Number:", FormTextField(name='ach_routing_number', value=data.get('ach_routing_number', ''), width=120, height=16), 
-                 "Account Number:", FormTextField(name='ach_account_number', value=data.get('ach_account_number', ''), width=150, height=16)],
-                ["Account Holder:", FormTextField(name='ach_account_holder_name', value=data.get('ach_account_holder_name', ''), width=120, height=16), 
-                 "Debit Date:", FormTextField(name='ach_debit_date', value=data.get('ach_debit_date', ''), width=80, height=16)]
-            ]
-            ach_table = Table(ach_data, colWidths=[1.2*inch, 1.8*inch, 1.1*inch, 2.4*inch])
-            ach_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content.append(ach_table)
-            content.append(Spacer(1, 6))
-            
-            # Check Payment Section with checkbox aligned to left margin
-            content.append(CheckboxWithText('payment_method_checks', 'Check', size=12))
-            content.append(Spacer(1, 3))
-            check_text = f"I will mail {num_payments} post-dated checks in the amount of {monthly_amount_str} each"
-            check_data = [
-                [check_text]
-            ]
-            check_table = Table(check_data, colWidths=[6*inch])
-            check_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content.append(check_table)
-            content.append(Spacer(1, 6))
-            
-            # Third Party Payer Section with checkbox aligned to left margin
-            content.append(CheckboxWithText('payment_method_third_party', 'Third Party Payer', size=12))
-            content.append(Spacer(1, 3))
-            
-            tp_data = [
-                ["Name:", FormTextField(name='third_party_payer_name', value=data.get('third_party_payer_name', ''), width=250, height=16)],
-                ["Relationship:", FormTextField(name='third_party_payer_relationship', value=data.get('third_party_payer_relationship', ''), width=200, height=16)],
-                ["Contact Information:", FormTextField(name='third_party_payer_contact', value=data.get('third_party_payer_contact', ''), width=280, height=16)]
-            ]
-            tp_table = Table(tp_data, colWidths=[1.5*inch, 4.5*inch])
-            tp_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content.append(tp_table)
-            
-        else:
-            # Static Payment Method Section
-            
-            # Credit Card Section
-            content.append(Paragraph("<b>☐ Credit Card</b>", self.styles['CompactText']))
-            content.append(Spacer(1, 4))
-            cc_data = [
-                ["Card Number:", '_' * 25, "Exp Date:", '_' * 10],
-                ["Cardholder Name:", '_' * 25, "CVV:", '_' * 8],
-                ["Billing ZIP:", '_' * 15, "Charge Date:", '_' * 15]
-            ]
-            cc_table = Table(cc_data, colWidths=[1.3*inch, 2.5*inch, 0.8*inch, 1.4*inch])
-            cc_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content.append(cc_table)
-            content.append(Spacer(1, 6))
-            
-            # ACH/Bank Transfer Section
-            content.append(Paragraph("<b>☐ ACH/Bank Transfer</b>", self.styles['CompactText']))
-            content.append(Spacer(1, 3))
-            ach_data = [
-                ["Routing Number:", '_' * 20, "Account Number:", '_' * 25],
-                ["Account Holder:", '_' * 20, "Debit Date:", '_' * 15]
-            ]
-            ach_table = Table(ach_data, colWidths=[1.2*inch, 1.8*inch, 1.1*inch, 2.4*inch])
-            ach_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content.append(ach_table)
-            content.append(Spacer(1, 6))
-            
-            # Check Payment Section with bold header and dynamic text on separate lines
-            content.append(Paragraph("<b>☐ Check</b>", self.styles['CompactText']))
-            content.append(Spacer(1, 3))
-            check_text = f"I will mail {num_payments} post-dated checks in the amount of {monthly_amount_str} each"
-            check_data = [
-                [check_text]
-            ]
-            check_table = Table(check_data, colWidths=[6*inch])
-            check_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content.append(check_table)
-            content.append(Spacer(1, 8))
-            
-            # Third Party Payer Section
-            content.append(Paragraph("<b>☐ Third Party Payer</b>", self.styles['CompactText']))
-            content.append(Spacer(1, 4))
-            tp_data = [
-                ["Name:", '_' * 45],
-                ["Relationship:", '_' * 35],
-                ["Contact Information:", '_' * 50]
-            ]
-            tp_table = Table(tp_data, colWidths=[1.5*inch, 4.5*inch])
-            tp_table.setStyle(TableStyle([
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 0),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 2),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ]))
-            content.append(tp_table)
+        # Payment method options; each field is fillable or a static underline
+        def field(name, w=150, blank=_UNDERLINE_25):
+            return self._field(name, data.get(name, ''), w=w, fillable=fillable, blank=blank)
+        
+        # Credit Card Section with checkbox aligned to left margin
+        content.append(self._option_header('payment_method_credit_card', 'Credit Card', fillable))
+        content.append(Spacer(1, 4))
+        cc_data = [
+            ["Card Number:", field('cc_number'), "Exp Date:", field('cc_exp_date', 60, _UNDERLINE_10)],
+            ["Cardholder Name:", field('cc_holder_name'), "CVV:", field('cc_cvv', 40, _UNDERLINE_8)],
+            ["Billing ZIP:", field('cc_zip', 80, _UNDERLINE_15), "Charge Date:", field('cc_charge_date', 80, _UNDERLINE_15)]
+        ]
+        cc_table = Table(cc_data, colWidths=[1.3*inch, 2.5*inch, 0.8*inch, 1.4*inch])
+        cc_table.setStyle(_COMPACT_TABLE_STYLE)
+        content.append(cc_table)
+        content.append(Spacer(1, 6))
+        
+        # ACH/Bank Transfer Section with checkbox aligned to left margin
+        content.append(self._option_header('payment_method_ach', 'ACH/Bank Transfer', fillable))
+        content.append(Spacer(1, 3))
+        ach_data = [
+            ["Routing Number:", field('ach_routing_number', 120, _UNDERLINE_20),
+             "Account Number:", field('ach_account_number')],
+            ["Account Holder:", field('ach_account_holder_name', 120, _UNDERLINE_20),
+             "Debit Date:", field('ach_debit_date', 80, _UNDERLINE_15)]
+        ]
+        ach_table = Table(ach_data, colWidths=[1.2*inch, 1.8*inch, 1.1*inch, 2.4*inch])
+        ach_table.setStyle(_COMPACT_TABLE_STYLE)
+        content.append(ach_table)
+        content.append(Spacer(1, 6))
+        
+        # Check Payment Section with checkbox aligned to left margin
+        content.append(self._option_header('payment_method_checks', 'Check', fillable))
+        content.append(Spacer(1, 3))
+        check_text = f"I will mail {num_payments} post-dated checks in the amount of {monthly_amount_str} each"
+        check_table = Table([[check_text]], colWidths=[6*inch])
+        check_table.setStyle(_COMPACT_TABLE_STYLE)
+        content.append(check_table)
+        content.append(Spacer(1, 6))
+        
+        # Third Party Payer Section with checkbox aligned to left margin
+        content.append(self._option_header('payment_method_third_party', 'Third Party Payer', fillable))
+        content.append(Spacer(1, 3))
+        tp_data = [
+            ["Name:", field('third_party_payer_name', 250, _UNDERLINE_45)],
+            ["Relationship:", field('third_party_payer_relationship', 200, _UNDERLINE_35)],
+            ["Contact Information:", field('third_party_payer_contact', 280, _UNDERLINE_50)]
+        ]
+        tp_table = Table(tp_data, colWidths=[1.5*inch, 4.5*inch])
+        tp_table.setStyle(_COMPACT_TABLE_STYLE)
+        content.append(tp_table)
         
         content.append(Spacer(1, 12))
         
         # Simple Signature Section
-        content.append(Paragraph("AGREEMENT", self.styles['SectionHeader']))
+        content.append(Paragraph("AGREEMENT", header))
         
         # Dynamic agreement message
         current_year = datetime.now().year
         academic_year_display = f"{current_year}-{current_year + 1}"
         
-        # Get division name from data and set school name for agreement text
-        student_division = data.get('division', 'YZA')
-        if student_division == 'YOH':
-            division_name = "Yeshiva Ohr Hatzafon"
-        elif student_division == 'KOLLEL':
-            division_name = "Kollel Ner Yehoshua"
-        else:  # YZA or default
-            division_name = "Yeshiva Zichron Aryeh"
-        
-        agreement_text = f"""I hereby enroll my son for the {academic_year_display} academic year in {division_name}. 
-        I understand that this is a binding obligation toward the Yeshiva and that I will be responsible for 
-        satisfaction of his tuition obligation as well as all costs incurred by my son, including damage caused 
-        to the Yeshiva property. With my signature I hereby accept the terms of this contract and authorize 
-        all payments required herein."""
-        
-        content.append(Paragraph(agreement_text, self.styles['SmallText']))
+        
+        agreement_text = _AGREEMENT_TEMPLATE.format(year=academic_year_display, division=division_name)
+        content.append(Paragraph(agreement_text, small,
+                                 frags=_agreement_frags(academic_year_display, division_name, small)))
         content.append(Spacer(1, 12))
         
         # Signature lines (fillable or static)
-        if fillable:
-            sig_data = [
-                ["Parent/Guardian Signature:", FormTextField(name='parent_signature', width=180, height=20), 
-                 "Date:", FormTextField(name='signature_date', value=datetime.now().strftime('%m/%d/%Y'), width=80, height=20)]
-            ]
-        else:
-            sig_data = [
-                ["Parent/Guardian Signature:", '_' * 35, "Date:", '_' * 15]
-            ]
+        sig_data = [
+            ["Parent/Guardian Signature:", self._field('parent_signature', w=180, h=20, fillable=fillable, blank=_UNDERLINE_35),
+             "Date:", self._field('signature_date', datetime.now().strftime('%m/%d/%Y'), w=80, h=20,
+                                  fillable=fillable, blank=_UNDERLINE_15)]
+        ]
         
         sig_table = Table(sig_data, colWidths=[2*inch, 2.5*inch, 0.7*inch, 1.3*inch])
-        sig_table.setStyle(TableStyle([
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
+        sig_table.setStyle(_SIGNATURE_TABLE_STYLE)
         content.append(sig_table)
         
         return content
@@ -614,147 +744,425 @@ class ContractStructureService:
         """Create Page 2 content - Tuition breakdown and payment schedule"""
         content = []
         
+        # Bind the styles used below to locals
+        title = self.styles['ContractTitle']
+        header = self.styles['SectionHeader']
+        compact = self.styles['CompactText']
+        
         # Page 2 Header
-        content.append(Paragraph("TUITION BREAKDOWN & PAYMENT SCHEDULE", self.styles['ContractTitle']))
+        content.append(Paragraph("TUITION BREAKDOWN & PAYMENT SCHEDULE", title))
         content.append(Spacer(1, 12))
         
         # Student name for reference
         student_name = data.get('student_name', 'Student')
-        content.append(Paragraph(f"Student: {student_name}", self.styles['CompactText']))
+        content.append(Paragraph(f"Student: {student_name}", compact))
         content.append(Spacer(1, 12))
         
         # Tuition Components Breakdown
-        content.append(Paragraph("TUITION COMPONENTS", self.styles['SectionHeader']))
+        content.append(Paragraph("TUITION COMPONENTS", header))
         
         # Get tuition components
         components = data.get('tuition_components', [])
         
         if components:
-            breakdown_data = [["Component", "Amount"]]
-            total_components = 0
-            
-            for component in components:
-                if component.get('is_enabled', True):
-                    name = component.get('name', '')
-                    amount = component.get('final_amount', 0)
-                    if isinstance(amount, (int, float)):
-                        amount_str = f"{amount:,.2f}"
-                        total_components += amount
-                    else:
-                        amount_str = str(amount)
-                    breakdown_data.append([name, amount_str])
-            
-            # Add total row
-            breakdown_data.append(["TOTAL", f"{total_components:,.2f}"])
+            # Cells stay plain strings (no Paragraph markup parsing); fonts come from the TableStyle
+            breakdown_data = self._breakdown_rows(components)
             
             breakdown_table = Table(breakdown_data, colWidths=[3*inch, 2*inch])
-            breakdown_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                ('TOPPADDING', (0, 0), (-1, -1), 6),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ]))
+            breakdown_table.setStyle(_BREAKDOWN_TABLE_STYLE)
             content.append(breakdown_table)
         else:
-            content.append(Paragraph("No tuition components available.", self.styles['CompactText']))
+            content.append(Paragraph("No tuition components available.", compact))
         
         content.append(Spacer(1, 20))
         
         # Payment Schedule
-        content.append(Paragraph("PAYMENT SCHEDULE", self.styles['SectionHeader']))
+        content.append(Paragraph("PAYMENT SCHEDULE", header))
         
+        # Get payment schedule rows (including the upfront registration fee)
+        schedule_data = self._schedule_rows(data)
+        
+        if schedule_data:
+            schedule_table = Table(schedule_data, colWidths=[1*inch, 2.5*inch, 1.5*inch])
+            schedule_table.setStyle(_SCHEDULE_TABLE_STYLE)
+            content.append(schedule_table)
+        else:
+            content.append(Paragraph("No payment schedule available.", compact))
+        
+        content.append(Spacer(1, 20))
+        
+        # Important Notes
+        content.append(Paragraph("IMPORTANT NOTES", header))
+        
+        # Get division name dynamically for notes section
+        division_name = _DIVISION_NAMES.get(data.get('division', 'YZA'), _DIVISION_NAMES['YZA'])[1]
+        
+        content.append(Paragraph(_NOTES_TEMPLATE.format(division=division_name), compact))
+        
+        return content
+
+    def _breakdown_rows(self, components):
+        """Build the tuition breakdown table rows, with header and total rows"""
+        # Drop disabled components up front; only numeric amounts count toward the total
+        enabled = [component for component in components if component.get('is_enabled', True)]
+        total_components = sum(amount for amount in (component.get('final_amount', 0) for component in enabled)
+                               if isinstance(amount, (int, float)))
+        
+        breakdown_data = [["Component", "Amount"]]
+        for component in enabled:
+            amount = component.get('final_amount', 0)
+            amount_str = _fmt_amount(float(amount)) if isinstance(amount, (int, float)) else str(amount)
+            breakdown_data.append([component.get('name', ''), amount_str])
+        
+        # Add total row
+        breakdown_data.append(["TOTAL", _fmt_amount(float(total_components))])
+        return breakdown_data
+
+    def _schedule_rows(self, data):
+        """Build the payment schedule table rows with a header row, or None without a schedule"""
         # Get payment schedule and registration fee info
         payment_schedule = data.get('payment_schedule', [])
+        if not payment_schedule:
+            return None
+        
         registration_option = data.get('registration_fee_option', 'upfront')
         registration_rolled_in = data.get('registration_rolled_in', False) or registration_option == 'rolled'
         registration_fee = data.get('registration_fee', '$750.00')
         
-        if payment_schedule:
-            schedule_data = [["Payment #", "Due Date", "Amount"]]
+        schedule_data = [["Payment #", "Due Date", "Amount"]]
+        
+        # Add registration fee as first line item if being charged upfront
+        if not registration_rolled_in:
+            # Format registration fee amount
+            if isinstance(registration_fee, str):
+                try:
+                    reg_fee_str = _fmt_amount(float(_MONEY_RE.sub('', registration_fee)))
+                except (ValueError, TypeError):
+                    reg_fee_str = registration_fee.replace('$', '')
+            else:
+                reg_fee_str = _fmt_amount(float(registration_fee))
             
-            # Add registration fee as first line item if being charged upfront
-            if not registration_rolled_in:
-                # Format registration fee amount
-                if isinstance(registration_fee, str):
-                    try:
-                        reg_fee_numeric = float(registration_fee.replace('$', '').replace(',', ''))
-                        reg_fee_str = f"{reg_fee_numeric:,.2f}"
-                    except (ValueError, TypeError):
-                        reg_fee_str = registration_fee.replace('$', '')
-                else:
-                    reg_fee_str = f"{registration_fee:,.2f}"
-                
-                schedule_data.append(["Registration", "At Contract Signing", reg_fee_str])
+            schedule_data.append(["Registration", "At Contract Signing", reg_fee_str])
+        
+        # Add regular payment schedule
+        for payment in payment_schedule:
+            payment_num = payment.get('payment_number', '')
+            due_date = payment.get('due_date', '')
+            # Format due date to show only month and year ("September 1, 2025" -> "September 2025")
+            match = _DUE_DATE_RE.match(due_date) if due_date else None
+            if match:
+                due_date = f"{match.group(1)} {match.group(2)}"
             
-            # Add regular payment schedule
-            for payment in payment_schedule:
-                payment_num = payment.get('payment_number', '')
-                due_date = payment.get('due_date', '')
-                # Format due date to show only month and year
-                if due_date and ',' in due_date:
-                    try:
-                        # Parse "September 1, 2025" and convert to "September 2025"
-                        parts = due_date.split(',')
-                        month_day = parts[0].strip()
-                        year = parts[1].strip()
-                        month = month_day.split(' ')[0]
-                        due_date = f"{month} {year}"
-                    except:
-                        pass  # Keep original format if parsing fails
-                
-                amount = payment.get('amount', 0)
-                if isinstance(amount, (int, float)):
-                    amount_str = f"{amount:,.2f}"
-                else:
-                    amount_str = str(amount)
-                
-                schedule_data.append([str(payment_num), due_date, amount_str])
+            amount = payment.get('amount', 0)
+            if isinstance(amount, (int, float)):
+                amount_str = _fmt_amount(float(amount))
+            else:
+                amount_str = str(amount)
             
-            schedule_table = Table(schedule_data, colWidths=[1*inch, 2.5*inch, 1.5*inch])
-            schedule_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ('TOPPADDING', (0, 0), (-1, -1), 4),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            content.append(schedule_table)
-        else:
-            content.append(Paragraph("No payment schedule available.", self.styles['CompactText']))
+            schedule_data.append([str(payment_num), due_date, amount_str])
         
-        content.append(Spacer(1, 20))
+        return schedule_data
+
+    # Direct canvas drawing (alternative to the platypus flowable layout)
+    
+    def _draw_text_field(self, c, name, value, x, y, width, height, fillable=True):
+        """Draw a fillable text field (or a blank signature line) with its bottom edge at y"""
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(0.5)
+        c.line(x, y, x + width, y)
+        if fillable:
+            c.acroForm.textfield(
+                name=name,
+                value=str(value) if value else "",
+                x=x,
+                y=y,
+                width=width,
+                height=height,
+                forceBorder=False,
+                borderStyle='solid',
+                borderWidth=0,
+                borderColor=None,
+                fillColor=colors.Color(0.95, 0.97, 1.0, alpha=0.2),
+                fontSize=10,
+            )
+
+    def _draw_checkbox(self, c, name, x, y, size=12, checked=False, fillable=True):
+        """Draw a checkbox square (fillable or static) with its bottom-left corner at (x, y)"""
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(0.5)
+        c.rect(x, y, size, size, fill=0)
+        if fillable:
+            c.acroForm.checkbox(
+                name=name,
+                checked=checked,
+                x=x,
+                y=y,
+                size=size,
+                forceBorder=False,
+                borderWidth=0,
+                borderColor=None,
+                fillColor=colors.Color(0.95, 0.97, 1.0, alpha=0.2),
+            )
+
+    def _draw_section_header(self, c, text, x, y):
+        """Draw a section header at y and return the baseline for the following line"""
+        c.setFillColor(colors.black)
+        c.setFont('Helvetica-Bold', 12)
+        c.drawString(x, y, text)
+        return y - 18
+
+    def _draw_field_rows(self, c, rows, x, y, col_widths, data, fillable=True):
+        """Draw rows of (label, field name, field width) pairs laid out on col_widths
         
-        # Important Notes
-        content.append(Paragraph("IMPORTANT NOTES", self.styles['SectionHeader']))
+        Returns the baseline below the last row.
+        """
+        for row in rows:
+            cell_x = x
+            for (label, name, width), (label_width, field_width) in zip(row, zip(col_widths[::2], col_widths[1::2])):
+                c.setFillColor(colors.black)
+                c.setFont('Helvetica', 9)
+                c.drawString(cell_x, y, label)
+                self._draw_text_field(c, name, data.get(name, ''), cell_x + label_width, y - 4, width, 16, fillable)
+                cell_x += label_width + field_width
+            y -= 22
+        return y
+
+    def _draw_grid_table(self, c, rows, x, y, col_widths, row_height, font_size, aligns, shade_last=False):
+        """Draw a gridded table whose top edge is at y, with a shaded bold header row
         
-        # Get division name dynamically for notes section
-        student_division = data.get('division', 'YZA')
-        if student_division == 'YOH':
-            division_name = "Yeshiva Ohr Hatzafon"
-        elif student_division == 'KOLLEL':
-            division_name = "Kollel Ner Yehoshua"
-        else:  # YZA or default
-            division_name = "Yeshiva Zichron Aryeh"
-        
-        notes_text = f"""
-        • Please do not modify this contract in any way<br/>
-        • If you have any questions or concerns please contact the financial office<br/>
-        • Checks should be mailed to {division_name}, PO Box 486, Cedarhurst, NY 11516
+        Returns the y coordinate of the table's bottom edge.
         """
-        content.append(Paragraph(notes_text, self.styles['CompactText']))
+        total_width = sum(col_widths)
+        top = y
+        last = len(rows) - 1
+        for index, row in enumerate(rows):
+            bottom = y - row_height
+            emphasized = index == 0 or (shade_last and index == last)
+            if emphasized:
+                c.setFillColor(colors.lightgrey)
+                c.rect(x, bottom, total_width, row_height, fill=1, stroke=0)
+            c.setFillColor(colors.black)
+            c.setFont('Helvetica-Bold' if emphasized else 'Helvetica', font_size)
+            text_y = bottom + (row_height - font_size) / 2 + 2
+            cell_x = x
+            for text, width, align in zip(row, col_widths, aligns):
+                if align == 'RIGHT':
+                    c.drawRightString(cell_x + width - 6, text_y, text)
+                elif align == 'CENTER':
+                    c.drawCentredString(cell_x + width / 2, text_y, text)
+                else:
+                    c.drawString(cell_x + 6, text_y, text)
+                cell_x += width
+            y = bottom
         
-        return content
+        xs = [x]
+        for width in col_widths:
+            xs.append(xs[-1] + width)
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(1)
+        c.grid(xs, [top - index * row_height for index in range(len(rows) + 1)])
+        return y
+
+    def _draw_page1_direct(self, c, data, fillable=True):
+        """Draw Page 1 (contract terms and payment info) straight onto the canvas"""
+        page_width, page_height = letter
+        left = 0.5 * inch
+        content_width = page_width - 2 * left
+        y = page_height - 0.5 * inch - 16
+        
+        # Header - Dynamic based on division
+        school_name, division_name = _DIVISION_NAMES.get(data.get('division', 'YZA'), _DIVISION_NAMES['YZA'])
+        
+        c.setFillColor(colors.black)
+        c.setFont('Helvetica-Bold', 16)
+        c.drawCentredString(page_width / 2, y, school_name)
+        y -= 20
+        c.drawCentredString(page_width / 2, y, "ENROLLMENT CONTRACT")
+        y -= 30
+        
+        # Student name and academic year
+        student_name = str(data.get('student_name', _UNDERLINE_40))
+        academic_year = str(data.get('academic_year', '2024-2025'))
+        c.setFont('Helvetica-Bold', 12)
+        c.drawString(left, y, "Student Name:")
+        c.setFont('Helvetica', 12)
+        c.drawString(left + c.stringWidth("Student Name: ", 'Helvetica-Bold', 12), y, student_name)
+        y -= 16
+        c.setFont('Helvetica-Bold', 10)
+        c.drawString(left, y, "Academic Year:")
+        c.setFont('Helvetica', 10)
+        c.drawString(left + c.stringWidth("Academic Year: ", 'Helvetica-Bold', 10), y, academic_year)
+        y -= 26
+        
+        # Payment Terms Section
+        y = self._draw_section_header(c, "PAYMENT TERMS", left, y)
+        
+        registration_option = data.get('registration_fee_option', 'upfront')
+        registration_rolled_in = data.get('registration_rolled_in', False) or registration_option == 'rolled'
+        
+        # Parse total_amount once, then format it with comma separators
+        total_amount = data.get('total_amount', '$0.00')
+        total_numeric = self._to_float(total_amount)
+        if total_numeric is not None:
+            total_amount = f"${_fmt_amount(total_numeric)}"
+        
+        c.setFont('Helvetica', 10)
+        if registration_rolled_in:
+            self._draw_checkbox(c, 'reg_fee_rolled', left, y - 2, checked=True, fillable=fillable)
+            c.setFillColor(colors.black)
+            c.drawString(left + 0.3 * inch, y, "Registration Fee: ROLLED INTO TUITION PAYMENTS")
+            y -= 18
+        else:
+            c.drawString(left, y, f"Registration Fee: {data.get('registration_fee', '$750.00')} - Due at contract signing")
+            y -= 18
+            self._draw_checkbox(c, 'payment_method_below', left, y - 2, fillable=fillable)
+            self._draw_checkbox(c, 'check_enclosed', left + 2.8 * inch, y - 2, fillable=fillable)
+            c.setFillColor(colors.black)
+            c.drawString(left + 0.3 * inch, y, "Use payment method below")
+            c.drawString(left + 3.1 * inch, y, "Check enclosed")
+            y -= 18
+        y -= 6
+        
+        # Tuition Total with note
+        c.setFont('Helvetica-Bold', 10)
+        c.drawString(left, y, f"TUITION TOTAL: {total_amount}")
+        y -= 13
+        c.setFont('Helvetica-Oblique', 10)
+        c.drawString(left, y, "See payment schedule and breakdown details on page 2")
+        y -= 26
+        
+        # Payment Method Section
+        y = self._draw_section_header(c, "PAYMENT METHOD", left, y)
+        
+        # Calculate dynamic values for check payment option
+        num_payments = len(data.get('payment_schedule', [])) or 10
+        if total_numeric is not None:
+            monthly_amount_str = f"${_fmt_amount(total_numeric / num_payments)}"
+        else:
+            monthly_amount_str = "$0.00"
+        
+        # Field rows are centered the way platypus centers their tables
+        sections = (
+            ('payment_method_credit_card', 'Credit Card', [1.3*inch, 2.5*inch, 0.8*inch, 1.4*inch], (
+                (("Card Number:", 'cc_number', 150), ("Exp Date:", 'cc_exp_date', 60)),
+                (("Cardholder Name:", 'cc_holder_name', 150), ("CVV:", 'cc_cvv', 40)),
+                (("Billing ZIP:", 'cc_zip', 80), ("Charge Date:", 'cc_charge_date', 80)),
+            )),
+            ('payment_method_ach', 'ACH/Bank Transfer', [1.2*inch, 1.8*inch, 1.1*inch, 2.4*inch], (
+                (("Routing Number:", 'ach_routing_number', 120), ("Account Number:", 'ach_account_number', 150)),
+                (("Account Holder:", 'ach_account_holder_name', 120), ("Debit Date:", 'ach_debit_date', 80)),
+            )),
+            ('payment_method_checks', 'Check', [6*inch], None),
+            ('payment_method_third_party', 'Third Party Payer', [1.5*inch, 4.5*inch], (
+                (("Name:", 'third_party_payer_name', 250),),
+                (("Relationship:", 'third_party_payer_relationship', 200),),
+                (("Contact Information:", 'third_party_payer_contact', 280),),
+            )),
+        )
+        for checkbox_name, label, col_widths, rows in sections:
+            self._draw_checkbox(c, checkbox_name, left, y - 2, fillable=fillable)
+            c.setFillColor(colors.black)
+            c.setFont('Helvetica-Bold', 10)
+            c.drawString(left + 18, y, label)
+            y -= 20
+            row_x = left + (content_width - sum(col_widths)) / 2
+            if rows is None:
+                c.setFont('Helvetica', 9)
+                c.drawString(row_x, y, f"I will mail {num_payments} post-dated checks in the amount of {monthly_amount_str} each")
+                y -= 22
+            else:
+                y = self._draw_field_rows(c, rows, row_x, y, col_widths, data, fillable)
+            y -= 6
+        y -= 8
+        
+        # Agreement Section
+        y = self._draw_section_header(c, "AGREEMENT", left, y)
+        
+        current_year = datetime.now().year
+        
+        agreement_text = _AGREEMENT_TEMPLATE.format(year=f"{current_year}-{current_year + 1}", division=division_name)
+        agreement_lines = simpleSplit(agreement_text, 'Helvetica', 8, content_width)
+        # Agreement lines, the gap and the signature fields (which reach 4pt below their baseline)
+        _require_direct_space(y, 10 * len(agreement_lines) + 24 + 4)
+        c.setFillColor(colors.black)
+        c.setFont('Helvetica', 8)
+        for line in agreement_lines:
+            c.drawString(left, y, line)
+            y -= 10
+        y -= 24
+        
+        # Signature line
+        sig_x = left + (content_width - 6.5 * inch) / 2
+        c.setFont('Helvetica', 10)
+        c.drawString(sig_x, y, "Parent/Guardian Signature:")
+        c.drawString(sig_x + 4.5 * inch, y, "Date:")
+        self._draw_text_field(c, 'parent_signature', '', sig_x + 2 * inch, y - 4, 180, 20, fillable)
+        self._draw_text_field(c, 'signature_date', datetime.now().strftime('%m/%d/%Y'),
+                              sig_x + 5.2 * inch, y - 4, 80, 20, fillable)
+
+    def _draw_page2_direct(self, c, data, fillable=True):
+        """Draw Page 2 (tuition breakdown and payment schedule) straight onto the canvas"""
+        page_width, page_height = letter
+        left = 0.5 * inch
+        content_width = page_width - 2 * left
+        y = page_height - 0.5 * inch - 16
+        
+        c.setFillColor(colors.black)
+        c.setFont('Helvetica-Bold', 16)
+        c.drawCentredString(page_width / 2, y, "TUITION BREAKDOWN & PAYMENT SCHEDULE")
+        y -= 30
+        
+        c.setFont('Helvetica', 10)
+        c.drawString(left, y, f"Student: {data.get('student_name', 'Student')}")
+        y -= 26
+        
+        # Tuition Components Breakdown
+        y = self._draw_section_header(c, "TUITION COMPONENTS", left, y)
+        components = data.get('tuition_components', [])
+        if components:
+            col_widths = [3*inch, 2*inch]
+            breakdown_rows = self._breakdown_rows(components)
+            _require_direct_space(y + 10, 22 * len(breakdown_rows))
+            y = self._draw_grid_table(c, breakdown_rows,
+                                      left + (content_width - sum(col_widths)) / 2, y + 10,
+                                      col_widths, 22, 10, ('LEFT', 'RIGHT'), shade_last=True)
+            y -= 30
+        else:
+            c.setFont('Helvetica', 10)
+            c.drawString(left, y, "No tuition components available.")
+            y -= 32
+        
+        # Payment Schedule
+        y = self._draw_section_header(c, "PAYMENT SCHEDULE", left, y)
+        schedule_data = self._schedule_rows(data)
+        if schedule_data:
+            col_widths = [1*inch, 2.5*inch, 1.5*inch]
+            _require_direct_space(y + 10, 17 * len(schedule_data))
+            y = self._draw_grid_table(c, schedule_data,
+                                      left + (content_width - sum(col_widths)) / 2, y + 10,
+                                      col_widths, 17, 9, ('CENTER', 'CENTER', 'RIGHT'))
+            y -= 30
+        else:
+            c.setFont('Helvetica', 10)
+            c.drawString(left, y, "No payment schedule available.")
+            y -= 32
+        
+        # Important Notes (header, then one 12pt line per note)
+        _require_direct_space(y, 18 + 12 * len(_NOTES_LINES))
+        y = self._draw_section_header(c, "IMPORTANT NOTES", left, y)
+        division_name = _DIVISION_NAMES.get(data.get('division', 'YZA'), _DIVISION_NAMES['YZA'])[1]
+        
+        c.setFont('Helvetica', 10)
+        for note in _NOTES_LINES:
+            c.drawString(left, y, note.format(division=division_name))
+            y -= 12
+
+
+def _build_contract_in_worker(data, output_path, fillable=True, debug=False, use_canvas=False):
+    """Process pool entry point: build one contract with the worker process's own service"""
+    return ContractStructureService().create_yza_contract(data, output_path, fillable=fillable,
+                                                          debug=debug, use_canvas=use_canvas)
+
 
 # Test the service if run directly
 if __name__ == "__main__":
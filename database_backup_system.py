@@ -10,13 +10,31 @@ import gzip
 import hashlib
 import json
 import threading
-import time
+import heapq
+import queue
 import logging
+import functools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import schedule
 
+# Optional orjson import for faster metadata writes
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional zstandard import for faster, multi-threaded backup compression
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 # Backup Logger
 backup_logger = logging.getLogger('database_backup')
 backup_handler = logging.FileHandler('logs/database_backup.log')
@@ -26,6 +44,143 @@ backup_handler.setFormatter(logging.Formatter(
 backup_logger.addHandler(backup_handler)
 backup_logger.setLevel(logging.INFO)
 
+# Read size for hashing and copying backup files
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Chunks read ahead of the hash/compress stage
+READ_AHEAD_DEPTH = 4
+
+# Backup type -> retention bucket used by cleanup_old_backups (other types are kept)
+RETENTION_BUCKETS = {'daily': 'daily', 'scheduled': 'daily', 'weekly': 'weekly', 'monthly': 'monthly'}
+
+# Backup types reported individually by get_backup_status (others count as manual)
+STATUS_BACKUP_TYPES = frozenset({'daily', 'weekly', 'monthly', 'manual', 'full'})
+
+# Longest the scheduler thread sleeps before re-checking the schedule
+SCHEDULER_MAX_SLEEP = 300  # seconds
+
+# gzip level for backups; SQLite pages gain little from the slower high levels
+GZIP_COMPRESS_LEVEL = 1
+
+# zstd level for backups (used instead of gzip when zstandard is installed)
+ZSTD_COMPRESS_LEVEL = 3
+
+class _HashingWriter:
+    """Write-through file wrapper that SHA-256 hashes everything written to it"""
+    
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+    
+    def write(self, data):
+        self.sha256.update(data)
+        return self.fileobj.write(data)
+    
+    def flush(self):
+        self.fileobj.flush()
+
+def _read_ahead(f, chunk_size: int = HASH_CHUNK_SIZE, depth: int = READ_AHEAD_DEPTH):
+    """Yield chunks of f read by a background thread up to depth chunks ahead
+    
+    File reads, SHA-256 and compression all release the GIL, so reading the
+    next chunk overlaps with hashing/compressing the current one.
+    """
+    chunks = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    
+    def reader():
+        try:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                if stop.is_set():
+                    return
+                chunks.put(chunk)
+            chunks.put(None)
+        except Exception as e:
+            chunks.put(e)
+    
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        # Unblock the reader if the consumer stopped early
+        stop.set()
+        try:
+            while True:
+                chunks.get_nowait()
+        except queue.Empty:
+            pass
+        thread.join()
+
+# Persistent read-only connections for databases that are checked repeatedly
+# (the live database); path -> (st_ino, connection)
+_readonly_connections = {}
+_readonly_connections_lock = threading.Lock()
+
+def _readonly_connection(db_path: str) -> sqlite3.Connection:
+    """Return the pooled read-only connection for db_path, reopening it if the file was replaced
+    
+    Caller must hold _readonly_connections_lock.
+    """
+    st_ino = os.stat(db_path).st_ino
+    entry = _readonly_connections.get(db_path)
+    if entry is not None:
+        if entry[0] == st_ino:
+            return entry[1]
+        entry[1].close()  # file was replaced (e.g. by a restore)
+    
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+    conn.execute("PRAGMA query_only=1")
+    _readonly_connections[db_path] = (st_ino, conn)
+    return conn
+
+def _close_readonly_connections():
+    """Close all pooled read-only connections"""
+    with _readonly_connections_lock:
+        for _, conn in _readonly_connections.values():
+            conn.close()
+        _readonly_connections.clear()
+
+@functools.lru_cache(maxsize=64)
+def _integrity_check(db_path: str, quick: bool, file_key: Tuple, pooled: bool = False) -> Tuple[bool, str]:
+    """Run PRAGMA quick_check/integrity_check, memoized on the file's stat key
+    
+    file_key is (st_mtime_ns, st_size) of the database and its -wal file, so any
+    write to the database invalidates the cached result. Errors are raised
+    rather than returned so they are never cached. pooled reuses a persistent
+    read-only connection instead of opening a new one.
+    """
+    pragma = "PRAGMA quick_check" if quick else "PRAGMA integrity_check"
+    if pooled:
+        with _readonly_connections_lock:
+            result = _readonly_connection(db_path).execute(pragma).fetchone()
+    else:
+        conn = sqlite3.connect(db_path)
+        try:
+            result = conn.execute(pragma).fetchone()
+        finally:
+            conn.close()
+    
+    if result and result[0] == 'ok':
+        return True, "Database integrity check passed"
+    return False, f"Database integrity check failed: {result}"
+
+def _integrity_file_key(db_path: str) -> Tuple:
+    """Stat key identifying the current contents of a database (and its WAL)"""
+    st = os.stat(db_path)
+    try:
+        wal = os.stat(f"{db_path}-wal")
+        wal_key = (wal.st_mtime_ns, wal.st_size)
+    except FileNotFoundError:
+        wal_key = None
+    return (st.st_mtime_ns, st.st_size, wal_key)
+
 class DatabaseBackupManager:
     """Comprehensive database backup and recovery management"""
     
@@ -43,10 +198,12 @@ class DatabaseBackupManager:
         # Initialize backup metadata
         self.metadata_file = self.backup_dir / 'backup_metadata.json'
         self.metadata = self._load_metadata()
+        self._index_backups()
         
         # Backup scheduler
         self.scheduler_running = False
         self.scheduler_thread = None
+        self._scheduler_stop = threading.Event()
         
         backup_logger.info("Database Backup Manager initialized")
     
@@ -69,40 +226,138 @@ class DatabaseBackupManager:
             }
         }
     
+    def _index_backups(self):
+        """Rebuild the name -> backup record index over self.metadata['backups']"""
+        self._by_name = {backup['name']: backup for backup in self.metadata['backups']}
+    
     def _save_metadata(self):
-        """Save backup metadata"""
+        """Save backup metadata (written to a temp file, then atomically renamed into place)"""
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2, default=str)
+            tmp_file = self.metadata_file.with_suffix('.json.tmp')
+            if ORJSON_AVAILABLE:
+                tmp_file.write_bytes(orjson.dumps(self.metadata, option=orjson.OPT_INDENT_2))
+            else:
+                with open(tmp_file, 'w') as f:
+                    json.dump(self.metadata, f, indent=2)
+            os.replace(tmp_file, self.metadata_file)
         except Exception as e:
             backup_logger.error(f"Error saving backup metadata: {e}")
     
     def _calculate_file_hash(self, file_path: str) -> str:
-        """Calculate SHA-256 hash of file for integrity verification"""
-        hash_sha256 = hashlib.sha256()
+        """Calculate SHA-256 hash of file for integrity verification
+        
+        hashlib.file_digest (Python 3.11+) runs the read/hash loop in C, where
+        OpenSSL picks the SHA extensions (SHA-NI) when the CPU has them.
+        """
         try:
             with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
+                if hasattr(hashlib, 'file_digest'):
+                    return hashlib.file_digest(f, 'sha256').hexdigest()
+                
+                hash_sha256 = hashlib.sha256()
+                for chunk in _read_ahead(f):
                     hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
+                return hash_sha256.hexdigest()
         except Exception as e:
             backup_logger.error(f"Error calculating hash for {file_path}: {e}")
             return None
     
-    def _verify_database_integrity(self, db_path: str) -> Tuple[bool, str]:
-        """Verify database integrity using SQLite's PRAGMA integrity_check"""
+    def _calculate_decompressed_hash(self, file_path: str) -> str:
+        """Calculate SHA-256 of a compressed backup's decompressed contents"""
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA integrity_check")
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result and result[0] == 'ok':
-                return True, "Database integrity check passed"
+            with open(file_path, 'rb') as raw_in:
+                if str(file_path).endswith('.zst'):
+                    if not ZSTD_AVAILABLE:
+                        raise RuntimeError(f"zstandard is required to read {file_path}")
+                    f_in = zstd.ZstdDecompressor().stream_reader(raw_in)
+                else:
+                    f_in = gzip.GzipFile(fileobj=raw_in, mode='rb')
+                with f_in:
+                    hash_sha256 = hashlib.sha256()
+                    for chunk in iter(lambda: f_in.read(HASH_CHUNK_SIZE), b""):
+                        hash_sha256.update(chunk)
+                    return hash_sha256.hexdigest()
+        except Exception as e:
+            backup_logger.error(f"Error calculating decompressed hash for {file_path}: {e}")
+            return None
+    
+    def _backup_hash_matches(self, backup: Dict) -> bool:
+        """Check a backup file against its recorded hash
+        
+        Compressed backups record the hash of the file as stored, alongside
+        original_hash. Entries written before original_hash existed recorded the
+        uncompressed database's hash instead, so those are checked by hashing
+        the decompressed stream.
+        """
+        if backup.get('compressed') and 'original_hash' not in backup:
+            return self._calculate_decompressed_hash(backup['file_path']) == backup['hash']
+        return self._calculate_file_hash(backup['file_path']) == backup['hash']
+    
+    def _compress_and_hash(self, source_path: Path, target_path: Path) -> Tuple[str, str]:
+        """Compress source_path into target_path in a single read pass
+        
+        A .zst target uses multi-threaded zstd, anything else gzip. Returns the
+        SHA-256 of the uncompressed database and of the compressed file as
+        stored (the latter is what restore_backup verifies).
+        """
+        original_sha256 = hashlib.sha256()
+        with open(source_path, 'rb') as f_in, open(target_path, 'wb') as raw_out:
+            hashed_out = _HashingWriter(raw_out)
+            if target_path.suffix == '.zst':
+                compressor = zstd.ZstdCompressor(level=ZSTD_COMPRESS_LEVEL, threads=-1)
+                f_out = compressor.stream_writer(hashed_out, closefd=False)
             else:
-                return False, f"Database integrity check failed: {result}"
-                
+                f_out = gzip.GzipFile(fileobj=hashed_out, mode='wb', compresslevel=GZIP_COMPRESS_LEVEL)
+            with f_out:
+                for chunk in _read_ahead(f_in):
+                    original_sha256.update(chunk)
+                    f_out.write(chunk)
+        return original_sha256.hexdigest(), hashed_out.sha256.hexdigest()
+    
+    def _decompress_backup(self, source_path: Path, target_path: Path):
+        """Decompress a .db.zst or .db.gz backup into target_path"""
+        if source_path.suffix == '.zst':
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError(f"zstandard is required to restore {source_path.name}")
+            with open(source_path, 'rb') as f_in, open(target_path, 'wb') as f_out:
+                zstd.ZstdDecompressor().copy_stream(f_in, f_out, read_size=HASH_CHUNK_SIZE,
+                                                    write_size=HASH_CHUNK_SIZE)
+        else:
+            with gzip.open(source_path, 'rb') as f_in:
+                with open(target_path, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+    
+    def _copy_file(self, source_path, target_path):
+        """Copy source_path to target_path, in the kernel via copy_file_range where available"""
+        with open(source_path, 'rb') as f_in, open(target_path, 'wb') as f_out:
+            if hasattr(os, 'copy_file_range'):
+                remaining = os.fstat(f_in.fileno()).st_size
+                try:
+                    while remaining > 0:
+                        copied = os.copy_file_range(f_in.fileno(), f_out.fileno(), remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                    return
+                except OSError:
+                    # e.g. unsupported by the filesystem; restart with a userspace copy
+                    f_in.seek(0)
+                    f_out.seek(0)
+                    f_out.truncate()
+            shutil.copyfileobj(f_in, f_out, length=HASH_CHUNK_SIZE)
+    
+    def _verify_database_integrity(self, db_path: str, quick: bool = True) -> Tuple[bool, str]:
+        """Verify database integrity using SQLite's PRAGMA quick_check or integrity_check
+        
+        quick_check skips the index/table cross-checks of the full integrity_check;
+        backup files are additionally covered by their SHA-256 hash.
+        Results are reused until the file is modified. The live database is
+        checked over a persistent read-only connection; backup and staging
+        files are short-lived, so they get a one-off connection.
+        """
+        db_path = str(db_path)
+        try:
+            return _integrity_check(db_path, quick, _integrity_file_key(db_path), db_path == self.database_path)
         except Exception as e:
             return False, f"Error during integrity check: {str(e)}"
     
@@ -142,23 +397,25 @@ class DatabaseBackupManager:
                     'backup_name': backup_name
                 }
             
-            # Calculate hash for verification
-            backup_hash = self._calculate_file_hash(str(backup_path))
             backup_size = backup_path.stat().st_size
             
-            # Compress backup if requested
+            # Compress backup if requested, hashing in the same pass
             if compress:
-                compressed_path = self.backup_dir / f"{backup_name}.db.gz"
-                with open(backup_path, 'rb') as f_in:
-                    with gzip.open(compressed_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
+                compressed_suffix = '.db.zst' if ZSTD_AVAILABLE else '.db.gz'
+                compressed_path = self.backup_dir / f"{backup_name}{compressed_suffix}"
+                original_hash, backup_hash = self._compress_and_hash(backup_path, compressed_path)
                 
                 backup_path.unlink()  # Remove uncompressed backup
                 backup_path = compressed_path
-                compressed_size = backup_path.stat().st_size
-                compression_ratio = (1 - compressed_size / backup_size) * 100
+                file_size = backup_path.stat().st_size
+                compression_ratio = (1 - file_size / backup_size) * 100
                 
-                backup_logger.info(f"Backup compressed: {backup_size:,} -> {compressed_size:,} bytes ({compression_ratio:.1f}% reduction)")
+                backup_logger.info(f"Backup compressed: {backup_size:,} -> {file_size:,} bytes ({compression_ratio:.1f}% reduction)")
+            else:
+                # Calculate hash for verification
+                backup_hash = self._calculate_file_hash(str(backup_path))
+                original_hash = backup_hash
+                file_size = backup_size
             
             # Record backup metadata
             backup_info = {
@@ -166,15 +423,17 @@ class DatabaseBackupManager:
                 'type': backup_type,
                 'timestamp': timestamp.isoformat(),
                 'file_path': str(backup_path),
-                'file_size': backup_path.stat().st_size,
+                'file_size': file_size,
                 'original_size': backup_size,
                 'compressed': compress,
                 'hash': backup_hash,
+                'original_hash': original_hash,
                 'integrity_verified': True,
                 'source_db_path': self.database_path
             }
             
             self.metadata['backups'].append(backup_info)
+            self._by_name[backup_name] = backup_info
             if backup_type == 'full':
                 self.metadata['last_full_backup'] = timestamp.isoformat()
             
@@ -196,16 +455,26 @@ class DatabaseBackupManager:
             }
     
     def _create_sqlite_backup(self, source_db: str, target_db: str):
-        """Create SQLite backup using the backup API (online backup)"""
+        """Create a consistent SQLite snapshot of source_db at target_db
+        
+        VACUUM INTO (SQLite 3.27+) writes a compacted copy in one statement
+        inside a read transaction; older SQLite falls back to the backup API.
+        """
         source_conn = sqlite3.connect(source_db)
-        target_conn = sqlite3.connect(target_db)
         
         try:
+            if sqlite3.sqlite_version_info >= (3, 27, 0):
+                source_conn.execute("VACUUM INTO ?", (target_db,))
+                return
+            
             # Use SQLite's backup API for consistent backup
-            source_conn.backup(target_conn)
+            target_conn = sqlite3.connect(target_db)
+            try:
+                source_conn.backup(target_conn)
+            finally:
+                target_conn.close()
         finally:
             source_conn.close()
-            target_conn.close()
     
     def restore_backup(self, backup_name: str, target_path: str = None) -> Dict:
         """Restore database from backup"""
@@ -216,11 +485,7 @@ class DatabaseBackupManager:
         
         try:
             # Find backup in metadata
-            backup_info = None
-            for backup in self.metadata['backups']:
-                if backup['name'] == backup_name:
-                    backup_info = backup
-                    break
+            backup_info = self._by_name.get(backup_name)
             
             if not backup_info:
                 return {
@@ -236,47 +501,30 @@ class DatabaseBackupManager:
                 }
             
             # Verify backup hash
-            current_hash = self._calculate_file_hash(str(backup_path))
-            if current_hash != backup_info['hash']:
+            if not self._backup_hash_matches(backup_info):
                 return {
                     'success': False,
                     'error': f"Backup file corrupted (hash mismatch)"
                 }
             
-            # Extract if compressed
-            restore_source = backup_path
+            # Decompress (or copy) once into a staging file next to the target,
+            # verify it there, then move it into place
+            staging_path = Path(f"{target_path}.tmp")
             if backup_info['compressed']:
-                temp_path = backup_path.with_suffix('')
-                with gzip.open(backup_path, 'rb') as f_in:
-                    with open(temp_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-                restore_source = temp_path
+                self._decompress_backup(backup_path, staging_path)
+            else:
+                self._copy_file(backup_path, staging_path)
             
-            # Verify backup integrity before restore
-            is_valid, integrity_msg = self._verify_database_integrity(str(restore_source))
+            # Verify backup integrity before it replaces the target (full check)
+            is_valid, integrity_msg = self._verify_database_integrity(str(staging_path), quick=False)
             if not is_valid:
-                if backup_info['compressed']:
-                    restore_source.unlink()  # Clean up temp file
+                staging_path.unlink()  # Clean up staging file
                 return {
                     'success': False,
                     'error': f"Backup corrupted: {integrity_msg}"
                 }
             
-            # Copy backup to target location
-            shutil.copy2(restore_source, target_path)
-            
-            # Clean up temp file if compressed
-            if backup_info['compressed'] and restore_source != backup_path:
-                restore_source.unlink()
-            
-            # Verify restored database
-            is_valid, integrity_msg = self._verify_database_integrity(target_path)
-            if not is_valid:
-                os.remove(target_path)
-                return {
-                    'success': False,
-                    'error': f"Restored database corrupted: {integrity_msg}"
-                }
+            os.replace(staging_path, target_path)
             
             backup_logger.info(f"Backup restored successfully to: {target_path}")
             return {
@@ -288,51 +536,54 @@ class DatabaseBackupManager:
             
         except Exception as e:
             backup_logger.error(f"Restore failed: {str(e)}")
+            staging = Path(f"{target_path}.tmp")
+            if staging.exists():
+                staging.unlink()
             return {
                 'success': False,
                 'error': str(e)
             }
     
+    def verify_all_backups(self) -> Dict[str, bool]:
+        """Re-hash every backup file in parallel and compare with its recorded hash
+        
+        hashlib releases the GIL while hashing, so a thread pool overlaps the
+        disk reads and SHA-256 work of different backups.
+        """
+        backups = list(self.metadata['backups'])
+        if not backups:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+            matches = executor.map(self._backup_hash_matches, backups)
+            return {backup['name']: match for backup, match in zip(backups, matches)}
+    
     def cleanup_old_backups(self):
         """Clean up old backups based on retention policy"""
         backup_logger.info("Starting backup cleanup")
         
         try:
-            now = datetime.now()
             backups_to_remove = []
             
-            # Group backups by type
-            daily_backups = []
-            weekly_backups = []
-            monthly_backups = []
-            
+            # Group backups by retention bucket in one pass
+            buckets = defaultdict(list)
             for backup in self.metadata['backups']:
-                backup_date = datetime.fromisoformat(backup['timestamp'])
-                backup_type = backup['type']
-                
-                if backup_type in ['daily', 'scheduled']:
-                    daily_backups.append(backup)
-                elif backup_type == 'weekly':
-                    weekly_backups.append(backup)
-                elif backup_type == 'monthly':
-                    monthly_backups.append(backup)
-            
-            # Sort by timestamp (newest first)
-            daily_backups.sort(key=lambda x: x['timestamp'], reverse=True)
-            weekly_backups.sort(key=lambda x: x['timestamp'], reverse=True)
-            monthly_backups.sort(key=lambda x: x['timestamp'], reverse=True)
-            
-            # Mark old backups for removal
-            if len(daily_backups) > self.max_daily_backups:
-                backups_to_remove.extend(daily_backups[self.max_daily_backups:])
-            
-            if len(weekly_backups) > self.max_weekly_backups:
-                backups_to_remove.extend(weekly_backups[self.max_weekly_backups:])
-            
-            if len(monthly_backups) > self.max_monthly_backups:
-                backups_to_remove.extend(monthly_backups[self.max_monthly_backups:])
+                bucket = RETENTION_BUCKETS.get(backup['type'])
+                if bucket:
+                    buckets[bucket].append(backup)
+            
+            # Keep the newest backups of each bucket, mark the rest for removal
+            limits = {
+                'daily': self.max_daily_backups,
+                'weekly': self.max_weekly_backups,
+                'monthly': self.max_monthly_backups,
+            }
+            for bucket, backups in buckets.items():
+                if len(backups) > limits[bucket]:
+                    keep = {id(b) for b in heapq.nlargest(limits[bucket], backups, key=lambda x: x['timestamp'])}
+                    backups_to_remove.extend(b for b in backups if id(b) not in keep)
             
-            # Remove old backup files and metadata
+            # Remove old backup files
             removed_count = 0
             for backup in backups_to_remove:
                 backup_path = Path(backup['file_path'])
@@ -340,9 +591,13 @@ class DatabaseBackupManager:
                     backup_path.unlink()
                     backup_logger.info(f"Removed old backup: {backup['name']}")
                     removed_count += 1
-                
-                # Remove from metadata
-                self.metadata['backups'] = [b for b in self.metadata['backups'] if b['name'] != backup['name']]
+            
+            # Remove from metadata in one pass
+            remove_names = {backup['name'] for backup in backups_to_remove}
+            if remove_names:
+                self.metadata['backups'] = [b for b in self.metadata['backups'] if b['name'] not in remove_names]
+                for name in remove_names:
+                    self._by_name.pop(name, None)
             
             self._save_metadata()
             backup_logger.info(f"Cleanup completed: {removed_count} old backups removed")
@@ -353,8 +608,6 @@ class DatabaseBackupManager:
     def get_backup_status(self) -> Dict:
         """Get comprehensive backup status"""
         try:
-            now = datetime.now()
-            
             # Count backups by type
             backup_counts = {'daily': 0, 'weekly': 0, 'monthly': 0, 'manual': 0, 'full': 0}
             total_size = 0
@@ -362,10 +615,7 @@ class DatabaseBackupManager:
             
             for backup in self.metadata['backups']:
                 backup_type = backup['type']
-                if backup_type in backup_counts:
-                    backup_counts[backup_type] += 1
-                else:
-                    backup_counts['manual'] += 1
+                backup_counts[backup_type if backup_type in STATUS_BACKUP_TYPES else 'manual'] += 1
                 
                 total_size += backup['file_size']
                 
@@ -373,20 +623,22 @@ class DatabaseBackupManager:
                     latest_backup = backup
             
             # Check if database exists and get its status
-            db_exists = os.path.exists(self.database_path)
-            db_size = os.path.getsize(self.database_path) if db_exists else 0
+            try:
+                db_exists, db_size = True, os.stat(self.database_path).st_size
+            except FileNotFoundError:
+                db_exists, db_size = False, 0
             
             # Check database integrity
             db_integrity = None
             if db_exists:
-                is_valid, integrity_msg = self._verify_database_integrity(self.database_path)
+                is_valid, integrity_msg = self._verify_database_integrity(self.database_path, quick=False)
                 db_integrity = {'valid': is_valid, 'message': integrity_msg}
             
             # Calculate time since last backup
             time_since_last_backup = None
             if latest_backup:
                 last_backup_time = datetime.fromisoformat(latest_backup['timestamp'])
-                time_since_last_backup = (now - last_backup_time).total_seconds() / 3600  # hours
+                time_since_last_backup = (datetime.now() - last_backup_time).total_seconds() / 3600  # hours
             
             return {
                 'database_exists': db_exists,
@@ -428,6 +680,7 @@ class DatabaseBackupManager:
         schedule.every().day.at("03:00").do(self.cleanup_old_backups)
         
         # Start scheduler thread
+        self._scheduler_stop.clear()
         self.scheduler_running = True
         self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
         self.scheduler_thread.start()
@@ -437,16 +690,23 @@ class DatabaseBackupManager:
     def stop_automated_backups(self):
         """Stop automated backup scheduler"""
         self.scheduler_running = False
+        self._scheduler_stop.set()  # wake the scheduler thread immediately
         schedule.clear()
         if self.scheduler_thread:
             self.scheduler_thread.join()
+        _close_readonly_connections()
         backup_logger.info("Automated backup scheduler stopped")
     
     def _run_scheduler(self):
-        """Run the backup scheduler"""
+        """Run the backup scheduler, sleeping until the next job is due"""
         while self.scheduler_running:
+            idle = schedule.idle_seconds()
+            # Re-check at least every SCHEDULER_MAX_SLEEP seconds (clock changes, new jobs)
+            if idle is None or idle > 0:
+                wait = SCHEDULER_MAX_SLEEP if idle is None else min(idle, SCHEDULER_MAX_SLEEP)
+                if self._scheduler_stop.wait(wait):
+                    break
             schedule.run_pending()
-            time.sleep(60)  # Check every minute
     
     def export_backup_config(self) -> Dict:
         """Export backup configuration for migration"""
@@ -464,6 +724,7 @@ class DatabaseBackupManager:
         """Import backup configuration"""
         if 'metadata' in config:
             self.metadata = config['metadata']
+            self._index_backups()
             self._save_metadata()
         
         if 'config' in config:
@@ -532,7 +793,7 @@ if __name__ == "__main__":
     import sys
     
     if len(sys.argv) < 2:
-        print("Usage: python database_backup_system.py [backup|restore|list|status]")
+        print("Usage: python database_backup_system.py [backup|restore|list|status|verify]")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -544,6 +805,9 @@ if __name__ == "__main__":
     elif command == 'status':
         status = backup_manager.get_backup_status()
         print(json.dumps(status, indent=2, default=str))
+    elif command == 'verify':
+        for name, ok in backup_manager.verify_all_backups().items():
+            print(f"{'✅' if ok else '❌'} {name}")
     elif command == 'restore' and len(sys.argv) >= 3:
         backup_name = sys.argv[2]
         result = restore_from_backup(backup_name)
@@ -5,109 +5,387 @@ Maintains all security features while using Dropbox for unlimited storage
 
 import os
 import hashlib
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import current_app
 
 try:
     import dropbox
     from dropbox.exceptions import AuthError, ApiError
+    # Upload write modes, resolved once rather than per upload
+    WRITE_MODE_OVERWRITE = dropbox.files.WriteMode.overwrite
+    WRITE_MODE_ADD = dropbox.files.WriteMode.add
     DROPBOX_AVAILABLE = True
 except ImportError:
     DROPBOX_AVAILABLE = False
 
+# Retries the Dropbox client makes on 5xx errors and on rate limiting (honoring
+# Retry-After) before raising; the SDK would otherwise retry rate limits forever
+DROPBOX_MAX_RETRIES_ON_ERROR = 4
+DROPBOX_MAX_RETRIES_ON_RATE_LIMIT = 5
+
+# Connections pooled per Dropbox host by the shared HTTP session
+HTTP_MAX_CONNECTIONS = 16
+_HTTP_SESSION = None
+_HTTP_SESSION_LOCK = threading.Lock()
+
+# Chunk size for upload sessions; concurrent sessions require multiples of 4 MiB
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Files larger than this go through a concurrent upload session instead of one
+# files_upload call (which is also capped at 150 MB by the API)
+UPLOAD_SESSION_THRESHOLD = 16 * 1024 * 1024
+
+# Chunks appended in parallel per upload session
+UPLOAD_SESSION_WORKERS = 4
+
+# Block size of Dropbox's content_hash
+CONTENT_HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Inputs larger than this are content-hashed on multiple threads
+CONTENT_HASH_PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+# Chunk size for streamed downloads
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Units used by DropboxService._format_bytes
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Folders already verified or created, as (access token, folder path); shared
+# across DropboxService instances since one is created per request
+_known_folders = set()
+_known_folders_lock = threading.Lock()
+
+# Most upload sessions files_upload_session_finish_batch_v2 accepts per call
+UPLOAD_BATCH_MAX_ENTRIES = 1000
+
+def _http_session():
+    """HTTP session shared by all Dropbox clients
+    
+    A DropboxService (and its client) is created per request; sharing one
+    pooled session keeps TLS connections to the API and content hosts alive
+    across requests and across concurrent upload-session appends.
+    """
+    global _HTTP_SESSION
+    with _HTTP_SESSION_LOCK:
+        if _HTTP_SESSION is None:
+            _HTTP_SESSION = dropbox.create_session(max_connections=HTTP_MAX_CONNECTIONS)
+        return _HTTP_SESSION
+
+def dropbox_content_hash(data):
+    """Dropbox content hash of bytes: SHA-256 of the concatenated SHA-256s of each 4 MiB block
+    
+    Large inputs hash their blocks on a thread pool; hashlib releases the GIL
+    while hashing, so the blocks are hashed on several cores.
+    """
+    view = memoryview(data)
+    blocks = (view[offset:offset + CONTENT_HASH_BLOCK_SIZE] for offset in range(0, len(view), CONTENT_HASH_BLOCK_SIZE))
+    
+    def block_digest(block):
+        return hashlib.sha256(block).digest()
+    
+    if len(view) > CONTENT_HASH_PARALLEL_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            digests = list(executor.map(block_digest, blocks))
+    else:
+        digests = map(block_digest, blocks)
+    return hashlib.sha256(b''.join(digests)).hexdigest()
+
 class DropboxService:
     def __init__(self):
         self.access_token = current_app.config.get('DROPBOX_ACCESS_TOKEN')
         self.folder_prefix = current_app.config.get('DROPBOX_FOLDER_PREFIX', '/StudentManagement')
-        self.client = None
-        
-        if DROPBOX_AVAILABLE and self.access_token:
-            try:
-                self.client = dropbox.Dropbox(self.access_token)
-                # Test connection
-                self.client.users_get_current_account()
-                current_app.logger.info("Dropbox connection established successfully")
-            except AuthError as e:
-                current_app.logger.error(f"Dropbox authentication failed: {str(e)}")
-                self.client = None
-            except Exception as e:
-                current_app.logger.error(f"Dropbox connection failed: {str(e)}")
-                self.client = None
+        self._folder_prefix_slash = f"{self.folder_prefix}/"
+        # Bound once so operations (including upload worker threads) skip the app-context proxy
+        self._logger = current_app.logger
+        self._client = None
+        self._client_initialized = False
+    
+    @property
+    def client(self):
+        """Dropbox client, connected on first use so local-only requests skip the account check"""
+        if not self._client_initialized:
+            self._client_initialized = True
+            if DROPBOX_AVAILABLE and self.access_token:
+                try:
+                    # The SDK retries rate-limited calls after the server's Retry-After
+                    # delay and 5xx errors with exponential backoff; bound both
+                    self._client = dropbox.Dropbox(
+                        self.access_token,
+                        session=_http_session(),
+                        max_retries_on_error=DROPBOX_MAX_RETRIES_ON_ERROR,
+                        max_retries_on_rate_limit=DROPBOX_MAX_RETRIES_ON_RATE_LIMIT
+                    )
+                    # Test connection
+                    self._client.users_get_current_account()
+                    self._logger.info("Dropbox connection established successfully")
+                except AuthError as e:
+                    self._logger.error(f"Dropbox authentication failed: {str(e)}")
+                    self._client = None
+                except Exception as e:
+                    self._logger.error(f"Dropbox connection failed: {str(e)}")
+                    self._client = None
+        return self._client
     
     def is_available(self):
         """Check if Dropbox is properly configured and available"""
         return DROPBOX_AVAILABLE and self.client is not None
     
-    def upload_file(self, file_data, remote_path, overwrite=True):
-        """Upload file to Dropbox"""
+    def upload_file(self, file_data, remote_path, overwrite=True, skip_if_unchanged=False):
+        """Upload file to Dropbox
+        
+        file_data is bytes or a readable stream; a stream is read from its
+        current position to the end and is not rewound afterwards.
+        
+        With skip_if_unchanged, bytes content that is already stored at
+        remote_path (same Dropbox content hash) is not uploaded again; this costs
+        one metadata lookup, so it is meant for re-sends to a fixed path.
+        """
         if not self.is_available():
             raise Exception("Dropbox is not available")
         
         try:
             # Ensure remote path starts with folder prefix
-            if not remote_path.startswith(self.folder_prefix):
-                remote_path = f"{self.folder_prefix}/{remote_path.lstrip('/')}"
+            remote_path = self._remote_path(remote_path)
+            
+            if skip_if_unchanged and not hasattr(file_data, 'read'):
+                existing = self._unchanged_file(file_data, remote_path)
+                if existing is not None:
+                    self._logger.info(f"File unchanged on Dropbox, upload skipped: {remote_path}")
+                    return existing
             
             # Create folders if they don't exist
             self._ensure_folder_exists(os.path.dirname(remote_path))
             
-            # Handle file data
+            # Upload mode
+            mode = WRITE_MODE_OVERWRITE if overwrite else WRITE_MODE_ADD
+            
+            # Handle file data; streams are read chunk by chunk rather than all at once
+            chunks = self._iter_chunks(file_data)
             if hasattr(file_data, 'read'):
-                file_content = file_data.read()
-                file_data.seek(0)  # Reset file pointer
+                head = list(itertools.islice(chunks, UPLOAD_SESSION_THRESHOLD // UPLOAD_CHUNK_SIZE + 1))
+                is_large = sum(map(len, head)) > UPLOAD_SESSION_THRESHOLD
+                file_content = None if is_large else b''.join(head)
+                chunks = itertools.chain(head, chunks)
             else:
+                is_large = len(file_data) > UPLOAD_SESSION_THRESHOLD
                 file_content = file_data
             
-            # Upload mode
-            mode = dropbox.files.WriteMode.overwrite if overwrite else dropbox.files.WriteMode.add
-            
-            # Upload file
-            result = self.client.files_upload(
-                file_content,
-                remote_path,
-                mode=mode,
-                autorename=True
-            )
+            # Upload file; large files are sent as parallel chunks
+            if is_large:
+                result = self._upload_session(chunks, remote_path, mode)
+            else:
+                result = self.client.files_upload(
+                    file_content,
+                    remote_path,
+                    mode=mode,
+                    autorename=True
+                )
             
             # Get file metadata
-            metadata = {
-                'path': result.path_display,
-                'size': result.size,
-                'hash': result.content_hash,
-                'modified': result.server_modified,
-                'id': result.id
-            }
+            metadata = self._file_metadata(result)
             
-            current_app.logger.info(f"File uploaded to Dropbox: {remote_path}")
+            self._logger.info(f"File uploaded to Dropbox: {remote_path}")
             return metadata
             
         except ApiError as e:
-            current_app.logger.error(f"Dropbox API error uploading {remote_path}: {str(e)}")
+            self._logger.error(f"Dropbox API error uploading {remote_path}: {str(e)}")
             raise Exception(f"Failed to upload file to Dropbox: {str(e)}")
         except Exception as e:
-            current_app.logger.error(f"Error uploading to Dropbox {remote_path}: {str(e)}")
+            self._logger.error(f"Error uploading to Dropbox {remote_path}: {str(e)}")
             raise
     
+    def upload_files_batch(self, files, overwrite=True):
+        """Upload several files to Dropbox, committing them in one batch call
+        
+        Args:
+            files: List of (file_data, remote_path) tuples; streams are read, not rewound
+            overwrite: Whether to overwrite existing files
+        
+        Returns:
+            list: Metadata dict per file, in input order; files that failed to
+            commit get {'path': ..., 'error': ...} instead
+        """
+        if not self.is_available():
+            raise Exception("Dropbox is not available")
+        
+        items = []
+        for file_data, remote_path in files:
+            remote_path = self._remote_path(remote_path)
+            file_content = file_data.read() if hasattr(file_data, 'read') else file_data
+            items.append((file_content, remote_path))
+        
+        try:
+            for folder in dict.fromkeys(os.path.dirname(remote_path) for _, remote_path in items):
+                self._ensure_folder_exists(folder)
+            
+            mode = WRITE_MODE_OVERWRITE if overwrite else WRITE_MODE_ADD
+            
+            # Large files need their own chunked session; upload those individually
+            results = [None] * len(items)
+            batched = []
+            for index, (file_content, remote_path) in enumerate(items):
+                if len(file_content) > UPLOAD_SESSION_THRESHOLD:
+                    results[index] = self.upload_file(file_content, remote_path, overwrite=overwrite)
+                else:
+                    batched.append(index)
+            
+            # Send each small file as a single closed session, in parallel
+            def start_session(index):
+                return self.client.files_upload_session_start(items[index][0], close=True).session_id
+            
+            with ThreadPoolExecutor(max_workers=UPLOAD_SESSION_WORKERS) as executor:
+                session_ids = list(executor.map(start_session, batched))
+            
+            entries = [
+                dropbox.files.UploadSessionFinishArg(
+                    cursor=dropbox.files.UploadSessionCursor(session_id=session_id, offset=len(items[index][0])),
+                    commit=dropbox.files.CommitInfo(path=items[index][1], mode=mode, autorename=True)
+                )
+                for index, session_id in zip(batched, session_ids)
+            ]
+            
+            # Commit all sessions with one call per UPLOAD_BATCH_MAX_ENTRIES files
+            for start in range(0, len(entries), UPLOAD_BATCH_MAX_ENTRIES):
+                batch_result = self.client.files_upload_session_finish_batch_v2(
+                    entries[start:start + UPLOAD_BATCH_MAX_ENTRIES]
+                )
+                for index, entry in zip(batched[start:start + UPLOAD_BATCH_MAX_ENTRIES], batch_result.entries):
+                    if entry.is_success():
+                        results[index] = self._file_metadata(entry.get_success())
+                    else:
+                        error = str(entry.get_failure())
+                        self._logger.error(f"Dropbox batch upload failed for {items[index][1]}: {error}")
+                        results[index] = {'path': items[index][1], 'error': error}
+            
+            self._logger.info(f"Batch uploaded {len(items)} files to Dropbox")
+            return results
+            
+        except ApiError as e:
+            self._logger.error(f"Dropbox API error in batch upload: {str(e)}")
+            raise Exception(f"Failed to upload files to Dropbox: {str(e)}")
+        except Exception as e:
+            self._logger.error(f"Error in Dropbox batch upload: {str(e)}")
+            raise
+    
+    def _remote_path(self, path):
+        """Path inside the folder prefix (paths already under it are kept as is)"""
+        if path.startswith(self.folder_prefix):
+            return path
+        return self._folder_prefix_slash + path.lstrip('/')
+    
+    def _unchanged_file(self, file_content, remote_path):
+        """Metadata of the file at remote_path if it already has file_content, else None"""
+        try:
+            existing = self.client.files_get_metadata(remote_path)
+        except ApiError:
+            return None  # Not there yet
+        
+        if getattr(existing, 'content_hash', None) == dropbox_content_hash(file_content):
+            return self._file_metadata(existing)
+        return None
+    
+    def _file_metadata(self, result):
+        """Metadata dict for an uploaded file"""
+        return {
+            'path': result.path_display,
+            'size': result.size,
+            'hash': result.content_hash,
+            'modified': result.server_modified,
+            'id': result.id
+        }
+    
+    def _iter_chunks(self, file_data):
+        """Yield UPLOAD_CHUNK_SIZE chunks of bytes or a file-like object; only the last may be shorter"""
+        if not hasattr(file_data, 'read'):
+            for offset in range(0, len(file_data), UPLOAD_CHUNK_SIZE):
+                yield file_data[offset:offset + UPLOAD_CHUNK_SIZE]
+            return
+        
+        while True:
+            # Streams may return short reads; concurrent sessions need full 4 MiB chunks
+            chunk = file_data.read(UPLOAD_CHUNK_SIZE)
+            while chunk and len(chunk) < UPLOAD_CHUNK_SIZE:
+                more = file_data.read(UPLOAD_CHUNK_SIZE - len(chunk))
+                if not more:
+                    break
+                chunk += more
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < UPLOAD_CHUNK_SIZE:
+                return
+    
+    def _upload_session(self, chunks, remote_path, mode):
+        """Upload chunks (from _iter_chunks) through a concurrent upload session
+        
+        Chunks are appended in parallel at their offsets, with at most
+        2 * UPLOAD_SESSION_WORKERS held in memory; the last chunk closes the
+        session before it is committed.
+        """
+        session = self.client.files_upload_session_start(
+            b'', session_type=dropbox.files.UploadSessionType.concurrent
+        )
+        offset = 0
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=UPLOAD_SESSION_WORKERS) as executor:
+            chunk = next(chunks, None)
+            while chunk is not None:
+                next_chunk = next(chunks, None)
+                cursor = dropbox.files.UploadSessionCursor(session_id=session.session_id, offset=offset)
+                pending.append(executor.submit(
+                    self.client.files_upload_session_append_v2, chunk, cursor, close=next_chunk is None
+                ))
+                offset += len(chunk)
+                chunk = next_chunk
+                
+                while len(pending) >= 2 * UPLOAD_SESSION_WORKERS:
+                    pending.popleft().result()  # re-raises a failed append
+            
+            for future in pending:
+                future.result()
+        
+        cursor = dropbox.files.UploadSessionCursor(session_id=session.session_id, offset=offset)
+        commit = dropbox.files.CommitInfo(path=remote_path, mode=mode, autorename=True)
+        return self.client.files_upload_session_finish(b'', cursor, commit)
+    
     def download_file(self, remote_path):
         """Download file from Dropbox"""
+        return b''.join(self.stream_download(remote_path))
+    
+    def stream_download(self, remote_path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+        """Download file from Dropbox as an iterator of byte chunks
+        
+        The request is made (and errors raised) here; the body is read as the
+        iterator is consumed, e.g. by a Flask streaming response.
+        """
         if not self.is_available():
             raise Exception("Dropbox is not available")
         
         try:
             # Ensure remote path starts with folder prefix
-            if not remote_path.startswith(self.folder_prefix):
-                remote_path = f"{self.folder_prefix}/{remote_path.lstrip('/')}"
+            remote_path = self._remote_path(remote_path)
             
             metadata, response = self.client.files_download(remote_path)
-            return response.content
+            return self._iter_response(response, chunk_size)
             
         except ApiError as e:
-            current_app.logger.error(f"Dropbox API error downloading {remote_path}: {str(e)}")
+            self._logger.error(f"Dropbox API error downloading {remote_path}: {str(e)}")
             raise Exception(f"Failed to download file from Dropbox: {str(e)}")
         except Exception as e:
-            current_app.logger.error(f"Error downloading from Dropbox {remote_path}: {str(e)}")
+            self._logger.error(f"Error downloading from Dropbox {remote_path}: {str(e)}")
             raise
     
+    @staticmethod
+    def _iter_response(response, chunk_size):
+        """Yield a download response's body in chunks, closing it when done"""
+        with response:
+            yield from response.iter_content(chunk_size=chunk_size)
+    
     def test_connection(self):
         """Test Dropbox connection and return account info"""
         if not DROPBOX_AVAILABLE:
@@ -149,7 +427,7 @@ class DropboxService:
             }
             
         except Exception as e:
-            current_app.logger.error(f"Error getting Dropbox storage usage: {str(e)}")
+            self._logger.error(f"Error getting Dropbox storage usage: {str(e)}")
             return {'error': str(e)}
     
     def _ensure_folder_exists(self, folder_path):
@@ -157,22 +435,30 @@ class DropboxService:
         if not folder_path or folder_path == '/':
             return
         
+        with _known_folders_lock:
+            if (self.access_token, folder_path) in _known_folders:
+                return
+        
         try:
             self.client.files_get_metadata(folder_path)
         except ApiError:
             # Folder doesn't exist, create it
             try:
                 self.client.files_create_folder_v2(folder_path)
-                current_app.logger.info(f"Created Dropbox folder: {folder_path}")
+                self._logger.info(f"Created Dropbox folder: {folder_path}")
             except ApiError as e:
                 if 'path/conflict/folder' not in str(e):
-                    current_app.logger.error(f"Error creating Dropbox folder {folder_path}: {str(e)}")
+                    self._logger.error(f"Error creating Dropbox folder {folder_path}: {str(e)}")
                     raise
+        
+        # Remember the folder and its ancestors, which must exist too
+        with _known_folders_lock:
+            while folder_path and folder_path != '/':
+                _known_folders.add((self.access_token, folder_path))
+                folder_path = os.path.dirname(folder_path)
     
     def _format_bytes(self, bytes_value):
         """Format bytes into human readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if bytes_value < 1024.0:
-                return f"{bytes_value:.1f} {unit}"
-            bytes_value /= 1024.0
-        return f"{bytes_value:.1f} PB"
+        # Each unit is 2**10 of the previous one, so the unit index comes from the bit length
+        index = min(max(int(bytes_value).bit_length() - 1, 0) // 10, len(BYTE_UNITS) - 1)
+        return f"{bytes_value / (1 << (index * 10)):.1f} {BYTE_UNITS[index]}"
@@ -4,11 +4,18 @@ Replaces OpenSign functionality with Dropbox Sign API
 """
 
 import os
+import io
+import re
 import base64
+import hmac
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from flask import current_app
+import requests
+from requests.adapters import HTTPAdapter
 
 try:
     from dropbox_sign import ApiClient, ApiException, Configuration, apis, models
@@ -18,6 +25,21 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Dropbox Sign REST API, called directly for simple GET endpoints
+DROPBOX_SIGN_API_URL = 'https://api.hellosign.com/v3'
+
+# Shared HTTP session for the direct GET endpoints, so status polls and sign-URL
+# lookups reuse pooled keep-alive connections across service instances
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50)
+_SESSION.mount('https://', _adapter)
+
+# Shape of a webhook signature (hex HMAC-SHA256); anything else is rejected before hashing
+_WEBHOOK_SIGNATURE_RE = re.compile(r'[0-9a-f]{64}')
+
+# Signature requests created concurrently by create_signature_requests_bulk
+BULK_REQUEST_WORKERS = 8
+
 class DropboxSignService:
     """Service for integrating with Dropbox Sign e-signature platform"""
     
@@ -26,11 +48,14 @@ class DropboxSignService:
         self.client_id = os.getenv('DROPBOX_SIGN_CLIENT_ID')
         self.test_mode = os.getenv('DROPBOX_SIGN_TEST_MODE', 'true').lower() == 'true'
         self.webhook_secret = os.getenv('DROPBOX_SIGN_WEBHOOK_SECRET')
+        self._webhook_key = self.webhook_secret.encode('utf-8') if self.webhook_secret else None
         
-        # Initialize configuration
+        # Initialize configuration and one API client (and connection pool) shared by all calls
         self.configuration = None
+        self._api_client = None
         if DROPBOX_SIGN_AVAILABLE and self.api_key:
             self.configuration = Configuration(username=self.api_key)
+            self._api_client = ApiClient(configuration=self.configuration)
     
     def is_available(self):
         """Check if Dropbox Sign is properly configured"""
@@ -44,55 +69,30 @@ class DropboxSignService:
             raise Exception("Dropbox Sign is not properly configured")
         
         try:
-            with ApiClient(configuration=self.configuration) as api_client:
-                signature_request_api = apis.SignatureRequestApi(api_client)
-                
-                # Create signers list
-                signers_list = []
-                for index, signer in enumerate(signers):
-                    signers_list.append(
-                        models.SubSignatureRequestSigner(
-                            email_address=signer.get('email'),
-                            name=signer.get('name'),
-                            order=index
-                        )
-                    )
-                
-                # Create a temporary file for the upload
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                    tmp_file.write(file_data)
-                    tmp_file_path = tmp_file.name
+            signature_request_api = apis.SignatureRequestApi(self._api_client)
+            
+            # Create signers list
+            signers_list = self._signers_list(signers)
+            
+            # Create signature request
+            data = models.SignatureRequestSendRequest(
+                title=title,
+                subject=subject,
+                message=message,
+                signers=signers_list,
+                files=[self._pdf_file(file_data)],
+                test_mode=self.test_mode
+            )
+            
+            response = signature_request_api.signature_request_send(data)
+            
+            return {
+                'success': True,
+                'signature_request_id': response.signature_request.signature_request_id,
+                'signatures': response.signature_request.signatures,
+                'message': 'Signature request created successfully'
+            }
                 
-                try:
-                    # Create signature request
-                    data = models.SignatureRequestSendRequest(
-                        title=title,
-                        subject=subject,
-                        message=message,
-                        signers=signers_list,
-                        files=[open(tmp_file_path, 'rb')],
-                        test_mode=self.test_mode
-                    )
-                    
-                    response = signature_request_api.signature_request_send(data)
-                    
-                    # Clean up temporary file
-                    os.unlink(tmp_file_path)
-                    
-                    return {
-                        'success': True,
-                        'signature_request_id': response.signature_request.signature_request_id,
-                        'signatures': response.signature_request.signatures,
-                        'message': 'Signature request created successfully'
-                    }
-                    
-                except Exception as e:
-                    # Clean up temporary file on error
-                    if os.path.exists(tmp_file_path):
-                        os.unlink(tmp_file_path)
-                    raise e
-                    
         except ApiException as e:
             logger.error(f"Dropbox Sign API error: {str(e)}")
             return {'success': False, 'error': str(e)}
@@ -108,56 +108,31 @@ class DropboxSignService:
             raise Exception("Dropbox Sign is not properly configured")
         
         try:
-            with ApiClient(configuration=self.configuration) as api_client:
-                signature_request_api = apis.SignatureRequestApi(api_client)
-                
-                # Create signers list
-                signers_list = []
-                for index, signer in enumerate(signers):
-                    signers_list.append(
-                        models.SubSignatureRequestSigner(
-                            email_address=signer.get('email'),
-                            name=signer.get('name'),
-                            order=index
-                        )
-                    )
-                
-                # Create a temporary file for the upload
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                    tmp_file.write(file_data)
-                    tmp_file_path = tmp_file.name
+            signature_request_api = apis.SignatureRequestApi(self._api_client)
+            
+            # Create signers list
+            signers_list = self._signers_list(signers)
+            
+            # Create embedded signature request
+            data = models.SignatureRequestCreateEmbeddedRequest(
+                client_id=self.client_id,
+                title=title,
+                subject=subject,
+                message=message,
+                signers=signers_list,
+                files=[self._pdf_file(file_data)],
+                test_mode=self.test_mode
+            )
+            
+            response = signature_request_api.signature_request_create_embedded(data)
+            
+            return {
+                'success': True,
+                'signature_request_id': response.signature_request.signature_request_id,
+                'signatures': response.signature_request.signatures,
+                'message': 'Embedded signature request created successfully'
+            }
                 
-                try:
-                    # Create embedded signature request
-                    data = models.SignatureRequestCreateEmbeddedRequest(
-                        client_id=self.client_id,
-                        title=title,
-                        subject=subject,
-                        message=message,
-                        signers=signers_list,
-                        files=[open(tmp_file_path, 'rb')],
-                        test_mode=self.test_mode
-                    )
-                    
-                    response = signature_request_api.signature_request_create_embedded(data)
-                    
-                    # Clean up temporary file
-                    os.unlink(tmp_file_path)
-                    
-                    return {
-                        'success': True,
-                        'signature_request_id': response.signature_request.signature_request_id,
-                        'signatures': response.signature_request.signatures,
-                        'message': 'Embedded signature request created successfully'
-                    }
-                    
-                except Exception as e:
-                    # Clean up temporary file on error
-                    if os.path.exists(tmp_file_path):
-                        os.unlink(tmp_file_path)
-                    raise e
-                    
         except ApiException as e:
             logger.error(f"Dropbox Sign API error: {str(e)}")
             return {'success': False, 'error': str(e)}
@@ -165,24 +140,62 @@ class DropboxSignService:
             logger.error(f"Error creating embedded signature request: {str(e)}")
             return {'success': False, 'error': str(e)}
     
+    def create_signature_requests_bulk(self, items: List[Dict[str, Any]],
+                                       embedded: bool = True) -> List[Dict[str, Any]]:
+        """Create several signature requests concurrently
+        
+        Args:
+            items: Keyword arguments for create_embedded_signature_request (or
+                create_signature_request when embedded is False), one dict per request
+            embedded: Whether to create embedded signature requests
+        
+        Returns:
+            list: Result dict per item, in input order
+        """
+        if not self.is_available():
+            raise Exception("Dropbox Sign is not properly configured")
+        
+        create = self.create_embedded_signature_request if embedded else self.create_signature_request
+        with ThreadPoolExecutor(max_workers=min(BULK_REQUEST_WORKERS, len(items) or 1)) as executor:
+            return list(executor.map(lambda item: create(**item), items))
+    
+    @staticmethod
+    def _signers_list(signers: List[Dict[str, Any]]) -> list:
+        """Build the SDK signer models, ordered as given"""
+        Signer = models.SubSignatureRequestSigner
+        return [
+            Signer(email_address=signer.get('email'), name=signer.get('name'), order=index)
+            for index, signer in enumerate(signers)
+        ]
+    
+    @staticmethod
+    def _pdf_file(file_data: bytes, name: str = 'document.pdf') -> io.BytesIO:
+        """Wrap PDF bytes as an in-memory file for the SDK's multipart upload (which needs .name)"""
+        pdf_file = io.BytesIO(file_data)
+        pdf_file.name = name
+        return pdf_file
+    
+    def _api_get(self, endpoint: str) -> Dict[str, Any]:
+        """GET a Dropbox Sign endpoint directly, skipping the SDK's model deserialization"""
+        response = _SESSION.get(f"{DROPBOX_SIGN_API_URL}/{endpoint}", auth=(self.api_key, ''), timeout=30)
+        response.raise_for_status()
+        return response.json()
+    
     def get_embedded_sign_url(self, signature_id: str) -> Dict[str, Any]:
         """Get embedded sign URL for a signature"""
         if not self.is_available():
             raise Exception("Dropbox Sign is not properly configured")
         
         try:
-            with ApiClient(configuration=self.configuration) as api_client:
-                embedded_api = apis.EmbeddedApi(api_client)
-                
-                response = embedded_api.embedded_sign_url(signature_id=signature_id)
-                
-                return {
-                    'success': True,
-                    'sign_url': response.embedded.sign_url,
-                    'expires_at': response.embedded.expires_at
-                }
-                
-        except ApiException as e:
+            embedded = self._api_get(f"embedded/sign_url/{signature_id}")['embedded']
+            
+            return {
+                'success': True,
+                'sign_url': embedded['sign_url'],
+                'expires_at': embedded['expires_at']
+            }
+            
+        except requests.HTTPError as e:
             logger.error(f"Dropbox Sign API error: {str(e)}")
             return {'success': False, 'error': str(e)}
         except Exception as e:
@@ -195,18 +208,15 @@ class DropboxSignService:
             raise Exception("Dropbox Sign is not properly configured")
         
         try:
-            with ApiClient(configuration=self.configuration) as api_client:
-                signature_request_api = apis.SignatureRequestApi(api_client)
-                
-                response = signature_request_api.signature_request_get(signature_request_id)
-                
-                return {
-                    'success': True,
-                    'signature_request': response.signature_request,
-                    'status': response.signature_request.status_code
-                }
-                
-        except ApiException as e:
+            signature_request = self._api_get(f"signature_request/{signature_request_id}")['signature_request']
+            
+            return {
+                'success': True,
+                'signature_request': signature_request,
+                'status': signature_request.get('status_code')
+            }
+            
+        except requests.HTTPError as e:
             logger.error(f"Dropbox Sign API error: {str(e)}")
             return {'success': False, 'error': str(e)}
         except Exception as e:
@@ -219,16 +229,15 @@ class DropboxSignService:
             raise Exception("Dropbox Sign is not properly configured")
         
         try:
-            with ApiClient(configuration=self.configuration) as api_client:
-                signature_request_api = apis.SignatureRequestApi(api_client)
-                
-                response = signature_request_api.signature_request_files(
-                    signature_request_id=signature_request_id,
-                    file_type=file_type
-                )
-                
-                return response
-                
+            signature_request_api = apis.SignatureRequestApi(self._api_client)
+            
+            response = signature_request_api.signature_request_files(
+                signature_request_id=signature_request_id,
+                file_type=file_type
+            )
+            
+            return response
+            
         except ApiException as e:
             logger.error(f"Dropbox Sign API error: {str(e)}")
             raise Exception(f"Failed to download files: {str(e)}")
@@ -242,20 +251,19 @@ class DropboxSignService:
             raise Exception("Dropbox Sign is not properly configured")
         
         try:
-            with ApiClient(configuration=self.configuration) as api_client:
-                signature_request_api = apis.SignatureRequestApi(api_client)
-                
-                data = models.SignatureRequestRemindRequest(
-                    email_address=email_address
-                )
-                
-                response = signature_request_api.signature_request_remind(
-                    signature_request_id=signature_request_id,
-                    signature_request_remind_request=data
-                )
-                
-                return True
-                
+            signature_request_api = apis.SignatureRequestApi(self._api_client)
+            
+            data = models.SignatureRequestRemindRequest(
+                email_address=email_address
+            )
+            
+            response = signature_request_api.signature_request_remind(
+                signature_request_id=signature_request_id,
+                signature_request_remind_request=data
+            )
+            
+            return True
+            
         except ApiException as e:
             logger.error(f"Dropbox Sign API error: {str(e)}")
             return False
@@ -269,15 +277,14 @@ class DropboxSignService:
             raise Exception("Dropbox Sign is not properly configured")
         
         try:
-            with ApiClient(configuration=self.configuration) as api_client:
-                signature_request_api = apis.SignatureRequestApi(api_client)
-                
-                response = signature_request_api.signature_request_cancel(
-                    signature_request_id=signature_request_id
-                )
-                
-                return True
-                
+            signature_request_api = apis.SignatureRequestApi(self._api_client)
+            
+            response = signature_request_api.signature_request_cancel(
+                signature_request_id=signature_request_id
+            )
+            
+            return True
+            
         except ApiException as e:
             logger.error(f"Dropbox Sign API error: {str(e)}")
             return False
@@ -285,25 +292,26 @@ class DropboxSignService:
             logger.error(f"Error canceling signature request: {str(e)}")
             return False
     
-    def send_tuition_contract(self, student_data: Dict[str, Any], tuition_amount: float,
+    def send_tuition_contract(self, student_data: Dict[str, Any],
                             parent_email: str = None) -> Dict[str, Any]:
         """Create and send tuition contract for signature using Dropbox Sign"""
         try:
-            # Generate PDF content using existing PDF service
-            from pdf_service import pdf_service
+            # Generate PDF content in memory using existing PDF service
+            from pdf_service import PDFService
+            from models import Student, DivisionConfig
             
-            contract_path = pdf_service.generate_tuition_contract_pdf(
-                student_data, tuition_amount, f"tuition_contract_{student_data.get('id', '')}"
-            )
+            student = Student.query.get(student_data.get('id'))
+            if not student:
+                logger.error(f"Student {student_data.get('id')} not found for tuition contract")
+                return {'success': False, 'error': 'Student not found'}
+            
+            division_config = DivisionConfig.query.filter_by(division=student.division).first()
+            pdf_data = PDFService.generate_tuition_contract_pdf(student, division_config)
             
-            if not contract_path:
+            if not pdf_data:
                 logger.error("Failed to generate PDF contract")
                 return {'success': False, 'error': 'Failed to generate PDF contract'}
             
-            # Read the generated PDF
-            with open(contract_path, 'rb') as f:
-                pdf_data = f.read()
-            
             # Prepare signers
             signers = [
                 {
@@ -332,31 +340,27 @@ class DropboxSignService:
                 expire_days=30
             )
             
-            # Clean up temporary PDF file
-            if os.path.exists(contract_path):
-                os.remove(contract_path)
-            
             return result
             
         except Exception as e:
             logger.error(f"Error sending tuition contract: {str(e)}")
             return {'success': False, 'error': str(e)}
     
-    def verify_webhook_signature(self, payload: str, signature: str) -> bool:
+    def verify_webhook_signature(self, payload: Union[bytes, str], signature: str) -> bool:
         """Verify webhook signature for security"""
-        if not self.webhook_secret:
+        if not self._webhook_key:
             logger.warning("No webhook secret configured")
             return False
         
-        import hmac
-        import hashlib
+        if not isinstance(signature, str) or not _WEBHOOK_SIGNATURE_RE.fullmatch(signature):
+            return False
         
         try:
-            expected_signature = hmac.new(
-                self.webhook_secret.encode('utf-8'),
-                payload.encode('utf-8'),
-                hashlib.sha256
-            ).hexdigest()
+            if isinstance(payload, str):
+                payload = payload.encode('utf-8')
+            
+            # One-shot hmac.digest runs entirely in OpenSSL (which picks SHA-NI where available)
+            expected_signature = hmac.digest(self._webhook_key, payload, 'sha256').hex()
             
             return hmac.compare_digest(signature, expected_signature)
         except Exception as e:
@@ -403,20 +407,19 @@ class DropboxSignService:
             raise Exception("Dropbox Sign is not properly configured")
         
         try:
-            with ApiClient(configuration=self.configuration) as api_client:
-                account_api = apis.AccountApi(api_client)
-                
-                response = account_api.account_get()
-                
-                return {
-                    'account_id': response.account.account_id,
-                    'email_address': response.account.email_address,
-                    'quota_documents_remaining': response.account.quota_documents_remaining,
-                    'quota_documents_used': response.account.quota_documents_used,
-                    'quota_api_signature_requests_remaining': response.account.quota_api_signature_requests_remaining,
-                    'quota_api_signature_requests_used': response.account.quota_api_signature_requests_used
-                }
-                
+            account_api = apis.AccountApi(self._api_client)
+            
+            response = account_api.account_get()
+            
+            return {
+                'account_id': response.account.account_id,
+                'email_address': response.account.email_address,
+                'quota_documents_remaining': response.account.quota_documents_remaining,
+                'quota_documents_used': response.account.quota_documents_used,
+                'quota_api_signature_requests_remaining': response.account.quota_api_signature_requests_remaining,
+                'quota_api_signature_requests_used': response.account.quota_api_signature_requests_used
+            }
+            
         except ApiException as e:
             logger.error(f"Dropbox Sign API error: {str(e)}")
             raise Exception(f"Failed to get account info: {str(e)}")
@@ -424,5 +427,7 @@ class DropboxSignService:
             logger.error(f"Error getting account info: {str(e)}")
             raise e
 
-# Global instance
-dropbox_sign_service = DropboxSignService() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_dropbox_sign_service() -> DropboxSignService:
+    """Shared service instance, created on first use rather than at import"""
+    return DropboxSignService() 
\ No newline at end of file
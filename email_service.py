@@ -8,42 +8,184 @@ from flask_mail import Message
 from extensions import mail
 from models import Student, DivisionConfig
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 import os
+import threading
+import time
+
+# Seconds a division's email sender settings are reused before re-querying
+EMAIL_CONFIG_CACHE_TTL = 300
+
+# Bumped whenever division email settings change to drop cached lookups
+_email_config_version = 0
+
+# Acceptance letter templates, loaded and compiled once per process
+_EMAIL_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'email_templates')
+_EMAIL_JINJA_ENV = Environment(loader=FileSystemLoader(_EMAIL_TEMPLATE_DIR), autoescape=True, auto_reload=False)
+
+_EMAIL_TEMPLATE_FILES = {
+    'YZA': 'yza_acceptance_letter.html',
+    'YOH': 'yoh_acceptance_letter.html'
+}
+
+_DEFAULT_EMAIL_TEMPLATE = """
+        <h2>Acceptance Letter</h2>
+        <p>Dear {{ student.student_first_name }} {{ student.student_last_name }},</p>
+        <p>Congratulations! You have been accepted to {{ division }}.</p>
+        <p>We look forward to welcoming you.</p>
+        """
+
+# Acceptance email HTML, split once into literal pieces so each email only
+# concatenates the variable parts
+_ACCEPTANCE_BODY = """
+<h2 style="color: #2c3e50; text-align: center;">{school_name}</h2>
+
+<p>Dear {student_name},</p>
+
+<p><strong>Congratulations!</strong> We are delighted to inform you that you have been accepted to {school_name}.</p>
+
+<p>Please find your official acceptance letter attached as a PDF document. This letter contains important information about your acceptance and next steps.</p>
+
+<p>We look forward to welcoming you to our Beis Medrash and are excited to have you join our Torah learning community.</p>
+
+<p>If you have any questions, please don't hesitate to contact our admissions office.</p>
+
+<p style="margin-top: 30px;">
+    Sincerely,<br>
+    <strong>Admissions Office</strong><br>
+    {school_name}
+</p>
+"""
+
+_EMAIL_HTML_HEAD = """
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+"""
+
+_EMAIL_HTML_TAIL = """
+        <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
+        <p style="font-size: 12px; color: #666;">
+            <strong>Note:</strong> Your official acceptance letter is attached as a PDF document. 
+            Please save this document for your records.
+        </p>
+    </div>
+</body>
+</html>
+"""
+
+_PREVIEW_HTML_HEAD = """
+<div style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+"""
+
+_PREVIEW_ATTACHMENT_HEAD = """
+    <div style="background-color: #f8f9fa; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0;">
+        <p style="margin: 0; font-size: 14px;">
+            <strong>📎 PDF Attachment:</strong> """
+
+_PREVIEW_ATTACHMENT_TAIL = """
+        </p>
+    </div>
+</div>
+"""
+
+def _school_name(division):
+    """School name used in acceptance emails for a division"""
+    return "Yeshiva Zichron Aryeh" if division == 'YZA' else "Yeshiva Ohr Hatzafon"
+
+@lru_cache(maxsize=4)
+def _acceptance_body_parts(school_name):
+    """Acceptance body for a school, split around the student name"""
+    head, tail = _ACCEPTANCE_BODY.replace('{school_name}', school_name).split('{student_name}')
+    return head, tail
+
+def _acceptance_body(school_name, student_name):
+    """Acceptance email body (greeting through signature)"""
+    head, tail = _acceptance_body_parts(school_name)
+    return head + student_name + tail
+
+def _email_html(body):
+    """Full email HTML around a body, with the PDF attachment note"""
+    return _EMAIL_HTML_HEAD + body + _EMAIL_HTML_TAIL
+
+def _preview_html(body, attachment_text):
+    """Preview HTML around a body, with a PDF attachment callout"""
+    return _PREVIEW_HTML_HEAD + body + _PREVIEW_ATTACHMENT_HEAD + attachment_text + _PREVIEW_ATTACHMENT_TAIL
+
+# Workers that build acceptance emails (PDF rendering, DB reads) for bulk sends
+_EMAIL_POOL = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+
+# SMTP connection held open by send_acceptance_emails_bulk for the current thread
+_bulk_smtp = threading.local()
+
+def _send_message(msg):
+    """Send msg over the open bulk SMTP connection if there is one, otherwise on its own connection"""
+    connection = getattr(_bulk_smtp, 'connection', None)
+    if connection is None:
+        mail.send(msg)
+        return
+    
+    try:
+        connection.send(msg)
+    except Exception:
+        _bulk_smtp.failures += 1
+        raise
+
+
+@lru_cache(maxsize=8)
+def _lookup_division_email_config(division, version, ttl_bucket):
+    """Query a division's email sender settings (memoized per version and TTL window)
+
+    Returns a plain dict rather than the model so cached values never hold a
+    detached instance across sessions or worker app contexts.
+    """
+    config = DivisionConfig.query.filter_by(division=division, is_active=True).first()
+    if not config:
+        return None
+    return {
+        'email_from_address': config.email_from_address,
+        'email_from_name': config.email_from_name,
+        'email_reply_to': config.email_reply_to
+    }
+
+
+def invalidate_email_config():
+    """Drop cached division email settings after they change"""
+    global _email_config_version
+    _email_config_version += 1
+
 
 class EmailService:
     """Service for handling acceptance emails"""
     
     @staticmethod
+    @lru_cache(maxsize=8)
     def get_email_template(division):
-        """Get the appropriate email template for the division"""
-        template_map = {
-            'YZA': 'templates/email_templates/yza_acceptance_letter.html',
-            'YOH': 'templates/email_templates/yoh_acceptance_letter.html'
-        }
-        
-        template_path = template_map.get(division)
-        if template_path and os.path.exists(template_path):
-            with open(template_path, 'r', encoding='utf-8') as f:
-                return f.read()
+        """Get the compiled email template for the division (render with template.render(**context))"""
+        template_name = _EMAIL_TEMPLATE_FILES.get(division)
+        if template_name:
+            try:
+                return _EMAIL_JINJA_ENV.get_template(template_name)
+            except TemplateNotFound:
+                pass
         
         # Default template if division-specific not found
-        return """
-        <h2>Acceptance Letter</h2>
-        <p>Dear {{ student.student_first_name }} {{ student.student_last_name }},</p>
-        <p>Congratulations! You have been accepted to {{ division }}.</p>
-        <p>We look forward to welcoming you.</p>
-        """
+        return _EMAIL_JINJA_ENV.from_string(_DEFAULT_EMAIL_TEMPLATE)
     
     @staticmethod
     def get_email_config(division):
         """Get email configuration for the division"""
-        config = DivisionConfig.query.filter_by(division=division, is_active=True).first()
+        config = _lookup_division_email_config(
+            division, _email_config_version, int(time.time() // EMAIL_CONFIG_CACHE_TTL)
+        )
         
         if config:
             return {
-                'from_email': config.email_from_address or current_app.config.get('MAIL_DEFAULT_SENDER'),
-                'from_name': config.email_from_name or f'{division} Admissions',
-                'reply_to': config.email_reply_to or config.email_from_address
+                'from_email': config['email_from_address'] or current_app.config.get('MAIL_DEFAULT_SENDER'),
+                'from_name': config['email_from_name'] or f'{division} Admissions',
+                'reply_to': config['email_reply_to'] or config['email_from_address']
             }
         
         # Default configuration
@@ -98,93 +240,14 @@ class EmailService:
             
             # Check if already sent
             if student.acceptance_email_sent:
-                return {
-                    'success': False, 
-                    'message': f'Acceptance email already sent on {student.acceptance_email_sent_date.strftime("%B %d, %Y") if student.acceptance_email_sent_date else "unknown date"}'
-                }
+                return EmailService._already_sent_result(student)
             
-            # Get email configuration
-            email_config = EmailService.get_email_config(student.division)
+            msg, pdf_content, pdf_filename = EmailService._build_acceptance_message(student)
             
-            # Generate PDF acceptance letter
-            from pdf_service import PDFService
-            pdf_content = PDFService.generate_acceptance_letter_pdf(student)
-            pdf_filename = PDFService.generate_filename(student)
+            # Send the email (on the bulk send's connection, if one is open)
+            _send_message(msg)
             
-            # Create simple email content (since the detailed letter is in the PDF)
-            school_name = "Yeshiva Zichron Aryeh" if student.division == 'YZA' else "Yeshiva Ohr Hatzafon"
-            student_name = student.student_name or f"{student.student_first_name or ''} {student.student_last_name or ''}".strip()
-            
-            html_content = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h2 style="color: #2c3e50; text-align: center;">{school_name}</h2>
-                    
-                    <p>Dear {student_name},</p>
-                    
-                    <p><strong>Congratulations!</strong> We are delighted to inform you that you have been accepted to {school_name}.</p>
-                    
-                    <p>Please find your official acceptance letter attached as a PDF document. This letter contains important information about your acceptance and next steps.</p>
-                    
-                    <p>We look forward to welcoming you to our Beis Medrash and are excited to have you join our Torah learning community.</p>
-                    
-                    <p>If you have any questions, please don't hesitate to contact our admissions office.</p>
-                    
-                    <p style="margin-top: 30px;">
-                        Sincerely,<br>
-                        <strong>Admissions Office</strong><br>
-                        {school_name}
-                    </p>
-                    
-                    <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
-                    <p style="font-size: 12px; color: #666;">
-                        <strong>Note:</strong> Your official acceptance letter is attached as a PDF document. 
-                        Please save this document for your records.
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            # Create the email message
-            msg = Message(
-                subject=f'Acceptance to {school_name} - Congratulations!',
-                sender=(email_config['from_name'], email_config['from_email']),
-                recipients=[student.email],
-                html=html_content,
-                reply_to=email_config['reply_to']
-            )
-            
-            # Attach the PDF
-            msg.attach(
-                filename=pdf_filename,
-                content_type='application/pdf',
-                data=pdf_content
-            )
-            
-            # Send the email
-            mail.send(msg)
-            
-            # Save PDF to attachments folder for record keeping
-            try:
-                PDFService.save_pdf_to_file(pdf_content, pdf_filename)
-                current_app.logger.info(f"✅ Saved acceptance letter PDF: {pdf_filename}")
-            except Exception as save_error:
-                current_app.logger.warning(f"⚠️ Could not save PDF to attachments folder: {save_error}")
-            
-            # Update the student record
-            student.acceptance_email_sent = True
-            student.acceptance_email_sent_date = datetime.utcnow()
-            student.acceptance_email_sent_by = sent_by_user
-            
-            from extensions import db
-            db.session.commit()
-            
-            return {
-                'success': True,
-                'message': f'Acceptance email with PDF attachment successfully sent to {student.email}'
-            }
+            return EmailService._record_acceptance_sent(student, sent_by_user, pdf_content, pdf_filename)
             
         except Exception as e:
             current_app.logger.error(f'Error sending acceptance email: {str(e)}')
@@ -193,6 +256,156 @@ class EmailService:
                 'message': f'Error sending email: {str(e)}'
             }
     
+    @staticmethod
+    def _already_sent_result(student):
+        """Result for a student whose acceptance email was already sent"""
+        return {
+            'success': False, 
+            'message': f'Acceptance email already sent on {student.acceptance_email_sent_date.strftime("%B %d, %Y") if student.acceptance_email_sent_date else "unknown date"}'
+        }
+    
+    @staticmethod
+    def _build_acceptance_message(student):
+        """Build the acceptance email for a student, returning (message, pdf_content, pdf_filename)"""
+        # Get email configuration
+        email_config = EmailService.get_email_config(student.division)
+        
+        # Generate PDF acceptance letter
+        from pdf_service import PDFService
+        pdf_content = PDFService.generate_acceptance_letter_pdf(student)
+        pdf_filename = PDFService.generate_filename(student)
+        
+        # Create simple email content (since the detailed letter is in the PDF)
+        school_name = _school_name(student.division)
+        student_name = student.student_name or f"{student.student_first_name or ''} {student.student_last_name or ''}".strip()
+        
+        html_content = _email_html(_acceptance_body(school_name, student_name))
+        
+        # Create the email message
+        msg = Message(
+            subject=f'Acceptance to {school_name} - Congratulations!',
+            sender=(email_config['from_name'], email_config['from_email']),
+            recipients=[student.email],
+            html=html_content,
+            reply_to=email_config['reply_to']
+        )
+        
+        # Attach the PDF
+        msg.attach(
+            filename=pdf_filename,
+            content_type='application/pdf',
+            data=pdf_content
+        )
+        
+        return msg, pdf_content, pdf_filename
+    
+    @staticmethod
+    def _record_acceptance_sent(student, sent_by_user, pdf_content, pdf_filename):
+        """Save the sent PDF and mark the student's acceptance email as sent"""
+        # Save PDF to attachments folder for record keeping
+        from pdf_service import PDFService
+        try:
+            PDFService.save_pdf_to_file(pdf_content, pdf_filename)
+            current_app.logger.info(f"✅ Saved acceptance letter PDF: {pdf_filename}")
+        except Exception as save_error:
+            current_app.logger.warning(f"⚠️ Could not save PDF to attachments folder: {save_error}")
+        
+        # Update the student record
+        student.acceptance_email_sent = True
+        student.acceptance_email_sent_date = datetime.utcnow()
+        student.acceptance_email_sent_by = sent_by_user
+        
+        from extensions import db
+        db.session.commit()
+        
+        return {
+            'success': True,
+            'message': f'Acceptance email with PDF attachment successfully sent to {student.email}'
+        }
+    
+    @staticmethod
+    def send_acceptance_emails_bulk(student_ids, sent_by_user):
+        """Send acceptance emails to several students over a single SMTP connection
+        
+        PDFs and messages are built on _EMAIL_POOL (each worker in its own app
+        context and database session) while this thread sends the finished ones
+        and records them, so SMTP round-trips overlap with PDF rendering.
+        Stops early once a third of the sends (at least 3) have failed at the
+        SMTP level, since the connection is then most likely unusable; students
+        not reached by then are reported as not sent.
+        
+        Returns:
+            dict: Overall status plus a result dict per student id
+        """
+        results = {}
+        student_ids = list(dict.fromkeys(student_ids))  # one email per student even if an id repeats
+        max_failures = max(3, len(student_ids) // 3)
+        aborted = False
+        
+        try:
+            students = {student.id: student for student in Student.query.filter(Student.id.in_(student_ids))}
+            
+            to_send = []
+            for student_id in student_ids:
+                student = students.get(student_id)
+                if not student:
+                    results[student_id] = {'success': False, 'message': 'Student not found'}
+                elif student.acceptance_email_sent:
+                    results[student_id] = EmailService._already_sent_result(student)
+                else:
+                    to_send.append(student_id)
+            
+            app = current_app._get_current_object()
+            
+            def build_message(student_id):
+                with app.app_context():
+                    return EmailService._build_acceptance_message(Student.query.get(student_id))
+            
+            futures = {_EMAIL_POOL.submit(build_message, student_id): student_id for student_id in to_send}
+            
+            with mail.connect() as connection:
+                _bulk_smtp.connection = connection
+                _bulk_smtp.failures = 0
+                try:
+                    for future in as_completed(futures):
+                        student_id = futures[future]
+                        try:
+                            msg, pdf_content, pdf_filename = future.result()
+                            _send_message(msg)
+                            results[student_id] = EmailService._record_acceptance_sent(
+                                students[student_id], sent_by_user, pdf_content, pdf_filename
+                            )
+                        except Exception as e:
+                            current_app.logger.error(f'Error sending acceptance email: {str(e)}')
+                            results[student_id] = {'success': False, 'message': f'Error sending email: {str(e)}'}
+                        
+                        if _bulk_smtp.failures >= max_failures:
+                            current_app.logger.error(f'Stopping bulk acceptance emails after {_bulk_smtp.failures} SMTP failures')
+                            aborted = True
+                            for pending in futures:
+                                pending.cancel()
+                            break
+                    
+                    if aborted:
+                        for student_id in futures.values():
+                            results.setdefault(student_id, {'success': False, 'message': 'Not sent: bulk send aborted'})
+                finally:
+                    _bulk_smtp.connection = None
+        except Exception as e:
+            current_app.logger.error(f'Error sending bulk acceptance emails: {str(e)}')
+            return {
+                'success': False,
+                'results': results,
+                'message': f'Error sending emails: {str(e)}'
+            }
+        
+        sent = sum(1 for result in results.values() if result['success'])
+        return {
+            'success': not aborted and len(results) == len(student_ids),
+            'results': results,
+            'message': f'{sent} of {len(student_ids)} acceptance emails sent'
+        }
+    
     @staticmethod
     def send_custom_acceptance_email(student_id, sent_by_user, custom_subject, custom_body):
         """Send a custom acceptance email with PDF attachment"""
@@ -211,21 +424,7 @@ class EmailService:
             pdf_filename = PDFService.generate_filename(student)
             
             # Use custom email content
-            html_content = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    {custom_body}
-                    
-                    <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
-                    <p style="font-size: 12px; color: #666;">
-                        <strong>Note:</strong> Your official acceptance letter is attached as a PDF document. 
-                        Please save this document for your records.
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
+            html_content = _email_html(custom_body)
             
             # Create the email message
             msg = Message(
@@ -243,8 +442,8 @@ class EmailService:
                 data=pdf_content
             )
             
-            # Send the email
-            mail.send(msg)
+            # Send the email (on the bulk send's connection, if one is open)
+            _send_message(msg)
             
             # Save PDF to attachments folder for record keeping
             try:
@@ -281,37 +480,14 @@ class EmailService:
             if not student:
                 return {'success': False, 'message': 'Student not found'}
             
-            school_name = "Yeshiva Zichron Aryeh" if student.division == 'YZA' else "Yeshiva Ohr Hatzafon"
+            school_name = _school_name(student.division)
             student_name = student.student_name or f"{student.student_first_name or ''} {student.student_last_name or ''}".strip()
             
             # Generate preview content
-            preview_content = f"""
-            <div style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <h2 style="color: #2c3e50; text-align: center;">{school_name}</h2>
-                
-                <p>Dear {student_name},</p>
-                
-                <p><strong>Congratulations!</strong> We are delighted to inform you that you have been accepted to {school_name}.</p>
-                
-                <p>Please find your official acceptance letter attached as a PDF document. This letter contains important information about your acceptance and next steps.</p>
-                
-                <p>We look forward to welcoming you to our Beis Medrash and are excited to have you join our Torah learning community.</p>
-                
-                <p>If you have any questions, please don't hesitate to contact our admissions office.</p>
-                
-                <p style="margin-top: 30px;">
-                    Sincerely,<br>
-                    <strong>Admissions Office</strong><br>
-                    {school_name}
-                </p>
-                
-                <div style="background-color: #f8f9fa; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0;">
-                    <p style="margin: 0; font-size: 14px;">
-                        <strong>📎 PDF Attachment:</strong> Official Acceptance Letter ({school_name.replace(' ', '_')}_Acceptance_Letter.pdf)
-                    </p>
-                </div>
-            </div>
-            """
+            preview_content = _preview_html(
+                _acceptance_body(school_name, student_name),
+                f"Official Acceptance Letter ({school_name.replace(' ', '_')}_Acceptance_Letter.pdf)"
+            )
             
             return {
                 'success': True,
@@ -328,36 +504,13 @@ class EmailService:
         """Generate a preview of the acceptance email from application data"""
         try:
             division = application.division or 'YZA'
-            school_name = "Yeshiva Zichron Aryeh" if division == 'YZA' else "Yeshiva Ohr Hatzafon"
+            school_name = _school_name(division)
             student_name = application.student_name or f"{application.student_first_name or ''} {application.student_last_name or ''}".strip()
             
-            preview_content = f"""
-            <div style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <h2 style="color: #2c3e50; text-align: center;">{school_name}</h2>
-                
-                <p>Dear {student_name},</p>
-                
-                <p><strong>Congratulations!</strong> We are delighted to inform you that you have been accepted to {school_name}.</p>
-                
-                <p>Please find your official acceptance letter attached as a PDF document. This letter contains important information about your acceptance and next steps.</p>
-                
-                <p>We look forward to welcoming you to our Beis Medrash and are excited to have you join our Torah learning community.</p>
-                
-                <p>If you have any questions, please don't hesitate to contact our admissions office.</p>
-                
-                <p style="margin-top: 30px;">
-                    Sincerely,<br>
-                    <strong>Admissions Office</strong><br>
-                    {school_name}
-                </p>
-                
-                <div style="background-color: #f8f9fa; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0;">
-                    <p style="margin: 0; font-size: 14px;">
-                        <strong>📎 PDF Attachment:</strong> Official Acceptance Letter (will be generated upon acceptance)
-                    </p>
-                </div>
-            </div>
-            """
+            preview_content = _preview_html(
+                _acceptance_body(school_name, student_name),
+                "Official Acceptance Letter (will be generated upon acceptance)"
+            )
             
             return {
                 'success': True,
@@ -374,30 +527,12 @@ class EmailService:
         """Get template content for editing based on application data"""
         try:
             division = application.division or 'YZA'
-            school_name = "Yeshiva Zichron Aryeh" if division == 'YZA' else "Yeshiva Ohr Hatzafon"
+            school_name = _school_name(division)
             student_name = application.student_name or f"{application.student_first_name or ''} {application.student_last_name or ''}".strip()
             
             subject = f'Acceptance to {school_name} - Congratulations!'
             
-            body = f"""
-            <h2 style="color: #2c3e50; text-align: center;">{school_name}</h2>
-            
-            <p>Dear {student_name},</p>
-            
-            <p><strong>Congratulations!</strong> We are delighted to inform you that you have been accepted to {school_name}.</p>
-            
-            <p>Please find your official acceptance letter attached as a PDF document. This letter contains important information about your acceptance and next steps.</p>
-            
-            <p>We look forward to welcoming you to our Beis Medrash and are excited to have you join our Torah learning community.</p>
-            
-            <p>If you have any questions, please don't hesitate to contact our admissions office.</p>
-            
-            <p style="margin-top: 30px;">
-                Sincerely,<br>
-                <strong>Admissions Office</strong><br>
-                {school_name}
-            </p>
-            """
+            body = _acceptance_body(school_name, student_name)
             
             return {
                 'success': True,
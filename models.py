@@ -4416,7 +4416,7 @@ class TuitionContract(db.Model):
     signed_contract_path = db.Column(db.String(500))  # Signed contract PDF
     
     # E-signature tracking (OpenSign)
-    opensign_document_id = db.Column(db.String(100))
+    opensign_document_id = db.Column(db.String(100), index=True)
     opensign_template_id = db.Column(db.String(100))
     opensign_status = db.Column(db.String(20))  # 'pending', 'completed', 'declined', 'expired'
     opensign_sent_date = db.Column(db.DateTime)
@@ -6,6 +6,7 @@ from datetime import datetime, date
 from sqlalchemy import and_, or_
 from typing import List, Dict, Optional, Tuple
 from services.student_progression_service import StudentProgressionService
+from utils.helpers import invalidate_active_academic_year
 
 class AcademicYearTransitionService:
     """Service class for managing academic year transitions and enrollment workflow"""
@@ -452,6 +453,7 @@ class AcademicYearTransitionService:
                 next_year.is_current = True
             
             db.session.commit()
+            invalidate_active_academic_year()
             
             return {
                 'success': True,
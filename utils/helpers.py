@@ -2,9 +2,19 @@
 Common helper functions used across the application
 """
 from datetime import datetime
+from functools import lru_cache
+import base64
+import binascii
 import hmac
 import hashlib
-from flask import current_app
+import time
+from flask import current_app, g
+
+# How long (seconds) a looked-up active academic year id may be reused
+ACTIVE_YEAR_CACHE_TTL = 300
+
+# Bumped whenever the active academic year changes to drop cached lookups
+_active_year_version = 0
 
 
 def parse_date(date_str):
@@ -34,11 +44,42 @@ def parse_decimal(value):
 
 
 def verify_webhook_signature(request_data, signature, secret):
-    """Verify webhook signature using HMAC"""
-    computed_signature = hmac.new(
-        secret.encode(),
-        request_data,
-        hashlib.sha256
-    ).hexdigest()
+    """Verify webhook signature (hex or base64 encoded) using HMAC-SHA256"""
+    if not signature:
+        return False
+    computed_signature = hmac.new(secret.encode(), request_data, hashlib.sha256).digest()
     
-    return hmac.compare_digest(computed_signature, signature) 
\ No newline at end of file
+    # Decode the provided signature to raw bytes so the comparison is byte-wise
+    try:
+        if len(signature) == 2 * hashlib.sha256().digest_size:
+            provided_signature = bytes.fromhex(signature)
+        else:
+            provided_signature = base64.b64decode(signature, validate=True)
+    except (ValueError, binascii.Error):
+        return False
+    
+    return hmac.compare_digest(computed_signature, provided_signature)
+
+
+@lru_cache(maxsize=1)
+def _lookup_active_academic_year_id(version, ttl_bucket):
+    """Query the active academic year id (memoized per version and TTL window)"""
+    from extensions import db
+    from models import AcademicYear
+    return db.session.query(AcademicYear.id).filter_by(is_active=True).limit(1).scalar()
+
+
+def get_active_academic_year_id():
+    """Get the active academic year id, cached on flask.g and for a short TTL"""
+    if 'active_academic_year_id' not in g:
+        g.active_academic_year_id = _lookup_active_academic_year_id(
+            _active_year_version, int(time.time() // ACTIVE_YEAR_CACHE_TTL)
+        )
+    return g.active_academic_year_id
+
+
+def invalidate_active_academic_year():
+    """Drop cached active academic year lookups after the active year changes"""
+    global _active_year_version
+    _active_year_version += 1
+    g.pop('active_academic_year_id', None)